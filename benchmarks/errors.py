@@ -0,0 +1,140 @@
+"""benchmarks/errors.py
+
+Measure the memory held by the errors of a large PyLint report, comparing
+the __slots__ and interned CheckerError class with the previous class
+(one __dict__ per instance and a new string for every parsed field).
+
+Run it from the repository root with: python benchmarks/errors.py
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from pythonchecker.main.model import CheckerPyLint  # noqa: E402
+
+
+# Messages of a typical PyLint report, most of them repeated verbatim.
+MESSAGES = [
+    ("C0111", "Missing docstring"),
+    ("C0103", "Invalid name \"x\" for type variable"),
+    ("C0301", "Line too long ({}/79)"),
+    ("W0612", "Unused variable 'value'"),
+    ("R0913", "Too many arguments ({}/5)"),
+    ("W0212", "Access to a protected member _cache of a client class"),
+]
+
+
+class LegacyError(object):
+    """Previous CheckerError class, with a __dict__ per instance."""
+
+    DEFAULT_CASE = "E"
+    DEFAULT_TYPE = ""
+
+    def __init__(self, code, line, column, message):
+        """Return a new instance of LegacyError."""
+
+        self.case = self.DEFAULT_CASE
+        self.type = self.DEFAULT_TYPE
+        self.code = self.fit_to_string(code)
+        self.line = self.fit_to_unsigned_integer(line)
+        self.column = self.fit_to_unsigned_integer(column)
+        self.message = self.fit_to_string(message)
+
+    @staticmethod
+    def fit_to_string(x):
+        """Parse variable to its equivalent string."""
+
+        x = str(x)
+        try:
+            return x.replace(x[0], x[0].upper(), 1)
+        except IndexError:
+            return ""
+
+    @staticmethod
+    def fit_to_unsigned_integer(x):
+        """Parse variable to its equivalent unsigned integer."""
+
+        try:
+            return max(int(x), 1)
+        except ValueError:
+            return 1
+
+
+def make_report(count):
+    """Return the output lines of a PyLint report with count errors."""
+
+    lines = []
+    for index in range(count):
+        code, message = MESSAGES[index % len(MESSAGES)]
+        message = message.format(80 + index % 40)
+        lines.append("{}:{}:{}:{}\n".format(
+            code, index // 10 + 1, index % 80, message))
+    return lines
+
+
+def parse_legacy(lines):
+    """Parse the report lines into LegacyError instances."""
+
+    errors = []
+    for line in lines:
+        match = CheckerPyLint.PATTERN.match(line)
+        if match:
+            error = LegacyError(**match.groupdict())
+            error.type = CheckerPyLint.NAME.lower()
+            error.case = error.code[0]
+            errors.append(error)
+    return errors
+
+
+def parse_current(lines):
+    """Parse the report lines into CheckerError instances."""
+
+    checker = CheckerPyLint()
+    checker.call_checker = lambda filepath, content=None: iter(lines)
+    return list(checker.check_file("module.py"))
+
+
+def measure(parse, lines):
+    """Return the bytes allocated by the errors which parse returns."""
+
+    gc.collect()
+    tracemalloc.start()
+    errors = parse(lines)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del errors
+    return size
+
+
+def main(argv=None):
+    """Run the benchmark from the command line."""
+
+    parser = argparse.ArgumentParser(
+        description="Compare the memory held by parsed checker errors.")
+    parser.add_argument(
+        "--errors", type=int, default=100000,
+        help="number of errors in the report (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    lines = make_report(args.errors)
+    # Parse once so that the lazy imports and caches are not measured.
+    parse_current(lines[:10])
+    legacy = measure(parse_legacy, lines)
+    current = measure(parse_current, lines)
+    print("{} errors".format(args.errors))
+    for name, size in [("__dict__ errors", legacy),
+                       ("__slots__ errors", current)]:
+        print("{:<18}{:>10.1f} KiB {:>8.1f} bytes/error".format(
+            name, size / 1024.0, size / float(args.errors)))
+    print("saving {:.0%}".format(1 - current / float(legacy)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
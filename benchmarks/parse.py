@@ -0,0 +1,115 @@
+"""benchmarks/parse.py
+
+Time the parsing of a large pep8 report, comparing the streaming parser of
+Checker.check_file with the previous one (whole output buffered in a
+StringIO, then matched and sorted), and the parse metric sampled every
+PARSE_SAMPLE lines with the same metric timed for every line.
+
+Run it from the repository root with: python benchmarks/parse.py
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from pythonchecker.main.model import CheckerPep8  # noqa: E402
+
+
+# Messages of a typical pep8 report.
+MESSAGES = [
+    ("E501", "line too long ({} > 79 characters)"),
+    ("E231", "missing whitespace after ','"),
+    ("W291", "trailing whitespace"),
+    ("E302", "expected 2 blank lines, found {}"),
+]
+
+
+def make_report(count):
+    """Return the output lines of a pep8 report with count errors."""
+
+    lines = []
+    for index in range(count):
+        code, message = MESSAGES[index % len(MESSAGES)]
+        lines.append("{}:{}:{}:{}\n".format(
+            code, index // 4 + 1, index % 80 + 1,
+            message.format(80 + index % 40)))
+    return lines
+
+
+def parse_buffered(lines):
+    """Parse the report as the previous check_file did."""
+
+    checker = CheckerPep8(inprocess=False)
+    out_result = StringIO("".join(lines))
+    out_result.seek(0)
+    out_result = list(x.strip("\n") for x in out_result.readlines())
+    matches = (re.match(checker.REGEX, x) for x in out_result)
+    matches = (m for m in matches if m)
+    return [checker._new_error(**match.groupdict()) for match in
+            sorted(matches, key=lambda m: int(m.group("line")))]
+
+
+def parse_streaming(lines, sample=CheckerPep8.PARSE_SAMPLE):
+    """Parse the report with check_file, timing one line out of sample."""
+
+    checker = CheckerPep8(inprocess=False)
+    checker.PARSE_SAMPLE = sample
+    checker.call_checker = lambda filepath, content=None: iter(lines)
+    return list(checker.check_file("module.py"))
+
+
+def parse_timed(lines):
+    """Parse the report with check_file, timing every line."""
+
+    return parse_streaming(lines, sample=1)
+
+
+def measure(parse, lines, repeat):
+    """Return the best time and the peak traced memory of a parser."""
+
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        parse(lines)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    parse(lines)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    """Run the benchmark from the command line."""
+
+    parser = argparse.ArgumentParser(
+        description="Compare the parsers of the checker output lines.")
+    parser.add_argument(
+        "--lines", type=int, default=100000,
+        help="number of lines in the report (default: %(default)s)")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="number of timed runs of every parser (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    lines = make_report(args.lines)
+    print("{} lines, best of {} runs".format(args.lines, args.repeat))
+    for name, parse in [("buffered", parse_buffered),
+                        ("streaming", parse_streaming),
+                        ("streaming, timed", parse_timed)]:
+        best, peak = measure(parse, lines, args.repeat)
+        print("{:<18}{:>8.1f} ms {:>8.2f} us/line {:>8.1f} MiB peak".format(
+            name, best * 1000, best * 1e6 / args.lines, peak / 1048576.0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,42 @@
 """Gedit Python Checker Plugin"""
 
-from . main.controller import Controller
+import time
 
- 
-class WindowActivatable(Controller):
-    """Plugin class."""
+from . _metrics import Metrics
 
-    def do_activate(self):
-        """Run in order to enable the plugin."""
+_start = time.time()
+try:
+    from gi.repository import Gedit
+except (ImportError, ValueError):
+    # Gedit is not available, e.g. when running the batch check from a
+    # terminal with "python3 -m pythonchecker".
+    Gedit = None
 
-        self.enable()
+if Gedit is not None:
+    from . main.controller import Controller
+    Metrics().observe("plugin.import", time.time() - _start)
 
-    def do_deactivate(self):
-        """Run in order to disable the plugin."""
+    class WindowActivatable(Controller):
+        """Plugin class."""
 
-        self.disable()
+        def do_activate(self):
+            """Run in order to enable the plugin."""
 
-    def do_update_state(self):
-        """Run in case of state update."""
+            with Metrics().timer("plugin.activate"):
+                self.enable()
 
-        pass
+        def do_deactivate(self):
+            """Run in order to disable the plugin."""
 
-    def do_create_configure_widget(self):
-        """Return preferences dialog."""
+            self.disable()
 
-        return self.configure()
+        def do_update_state(self):
+            """Run in case of state update."""
+
+            pass
+
+        def do_create_configure_widget(self):
+            """Return preferences dialog."""
+
+            return self.configure()
 
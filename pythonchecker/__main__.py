@@ -0,0 +1,10 @@
+"""__main__.py
+
+Run the project-wide batch check from a terminal.
+"""
+
+import sys
+
+from . main.batch import main
+
+sys.exit(main())
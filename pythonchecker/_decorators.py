@@ -3,6 +3,7 @@
 Auxiliary decorators for plugin methods.
 """
 
+from threading import Event
 from threading import Thread
 from gi.repository import GLib
 
@@ -38,3 +39,26 @@ def threaded_with_glib(func):
 
     return wrapper
 
+
+def synchronized_with_glib(func):
+    """Run function within the GLib main loop and wait for its result."""
+
+    def wrapper(self, *args, **kwargs):
+        """Function wrapper."""
+
+        done = Event()
+        result = []
+
+        def inner():
+            """Function inside wrapper."""
+            try:
+                result.append(func(self, *args, **kwargs))
+            finally:
+                done.set()
+            return False
+
+        GLib.idle_add(inner)
+        done.wait()
+        return result[0] if result else None
+
+    return wrapper
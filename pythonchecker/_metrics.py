@@ -0,0 +1,177 @@
+"""_metrics.py
+
+Auxiliary counters, histograms and timers to measure the plugin.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from threading import RLock
+
+
+class Histogram(object):
+    """Distribution of durations (in seconds) over fixed buckets."""
+
+    # Upper bounds (in milliseconds) of the buckets.
+    BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+    def __init__(self):
+        """Run when creating a new instance of Histogram."""
+
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.buckets = [0] * (len(self.BOUNDS) + 1)
+
+    def observe(self, seconds):
+        """Add a duration to the histogram."""
+
+        self.count += 1
+        self.total += seconds
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+        if self.maximum is None or seconds > self.maximum:
+            self.maximum = seconds
+        millis = seconds * 1000
+        for index, bound in enumerate(self.BOUNDS):
+            if millis <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def get_mean(self):
+        """Return the mean duration or None if there are no durations."""
+
+        return self.total / self.count if self.count else None
+
+    def get_percentile(self, percent):
+        """Return the bucket upper bound (in seconds) of a percentile.
+
+        Durations above the last bound are given by the maximum.
+        """
+
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, amount in enumerate(self.buckets[:-1]):
+            seen += amount
+            if seen >= rank:
+                return min(self.BOUNDS[index] / 1000.0, self.maximum)
+        return self.maximum
+
+    def to_dict(self):
+        """Export the histogram into a dictionary."""
+
+        labels = ["<={}ms".format(x) for x in self.BOUNDS]
+        labels.append(">{}ms".format(self.BOUNDS[-1]))
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.get_mean(),
+            "p50": self.get_percentile(50),
+            "p95": self.get_percentile(95),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class Metrics(object):
+    """Process-wide store of counters and duration histograms.
+
+    Every Metrics() call returns the same instance, so any module can
+    record values without passing the store around.
+    """
+
+    _instance = None
+    _lock = RLock()
+
+    def __new__(cls):
+        """Return the shared Metrics instance."""
+
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(Metrics, cls).__new__(cls)
+                cls._instance.info = {}
+                cls._instance.reset()
+            return cls._instance
+
+    def reset(self):
+        """Forget all the recorded values."""
+
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def set_info(self, name, value):
+        """Store a description value (e.g. a checker version) for exports.
+
+        Description values are kept when the metrics are reset.
+        """
+
+        with self._lock:
+            self.info[name] = value
+
+    def count(self, name, value=1):
+        """Increase a counter."""
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """Add a duration (in seconds) to a histogram."""
+
+        with self._lock:
+            try:
+                histogram = self.histograms[name]
+            except KeyError:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Context manager which adds its duration to a histogram."""
+
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - start)
+
+    def to_dict(self, extra=None):
+        """Export the recorded values into a dictionary.
+
+        The dictionary also describes the machine and the stored
+        description values (updated by extra), so exports from different
+        machines or checker versions can be compared.
+        """
+
+        import platform
+
+        with self._lock:
+            out = {
+                "system": {
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "processor": platform.processor(),
+                },
+                "uptime": time.time() - self.started,
+                "counters": dict(self.counters),
+                "histograms": dict((key, val.to_dict())
+                                   for key, val in self.histograms.items()),
+            }
+            out["system"].update(self.info)
+        out["system"].update(extra or {})
+        return out
+
+    def export(self, path, extra=None):
+        """Write the recorded values into a JSON file."""
+
+        with open(path, "w") as json_file:
+            json.dump(self.to_dict(extra), json_file, indent=4,
+                      sort_keys=True)
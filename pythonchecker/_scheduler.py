@@ -0,0 +1,229 @@
+"""_scheduler.py
+
+Debounced and coalescing job scheduler for plugin tasks.
+"""
+
+import time
+import traceback
+from threading import Condition
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+from . _metrics import Metrics
+
+
+class Job(object):
+    """Unit of work handled by the Scheduler."""
+
+    def __init__(self, key, func, args, kwargs, due, generation=0,
+                 scheduler=None):
+        """Run when creating a new instance of Job."""
+
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.due = due
+        self.generation = generation
+        self.scheduler = scheduler
+        self.cancelled = Event()
+        self.callbacks = []
+        self.lock = Lock()
+
+    def cancel(self):
+        """Mark the job as superseded so its results are dropped.
+
+        The registered cancel callbacks are called once (e.g. to kill the
+        processes started by the job).
+        """
+
+        with self.lock:
+            if self.cancelled.is_set():
+                return
+            self.cancelled.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_cancel_callback(self, callback):
+        """Register a callback to be called when the job is cancelled.
+
+        The callback is called at once if the job is already cancelled.
+        """
+
+        with self.lock:
+            if not self.cancelled.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def is_cancelled(self):
+        """Return True if the job has been superseded.
+
+        A job is also stale as soon as a newer job has been scheduled for
+        its key, even before the scheduler cancels it.
+        """
+
+        if self.cancelled.is_set():
+            return True
+        if self.scheduler is None:
+            return False
+        return self.scheduler.get_generation(self.key) != self.generation
+
+    def run(self):
+        """Call the job function."""
+
+        return self.func(*self.args, **self.kwargs)
+
+
+class Scheduler(object):
+    """Central scheduler with a debounce window and a bounded queue.
+
+    Jobs are identified by a key (e.g. a document path). Scheduling a key
+    which is still pending replaces the pending job and restarts its
+    debounce window, and scheduling a key which is running cancels the
+    running job, which should drop its results when it is done.
+    """
+
+    DELAY = 0.3
+    QUEUE_SIZE = 16
+    WORKERS = 2
+
+    def __init__(self, delay=None, queue_size=None, workers=None):
+        """Run when creating a new instance of Scheduler."""
+
+        self.delay = delay if delay is not None else self.DELAY
+        self.queue_size = \
+            queue_size if queue_size is not None else self.QUEUE_SIZE
+        self.workers = workers if workers is not None else self.WORKERS
+        self.pending = {}
+        self.running = {}
+        self.generations = {}
+        self.condition = Condition()
+        self.threads = []
+        self.stopped = False
+
+    def start(self):
+        """Launch the worker threads if they are not running yet."""
+
+        with self.condition:
+            if self.threads or self.stopped:
+                return
+            for _ in range(self.workers):
+                thread = Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+
+    def schedule(self, key, func, *args, **kwargs):
+        """Schedule a job for a key, replacing any pending one.
+
+        The keyword argument "delay" overrides the debounce window. The
+        function receives the Job instance as its first argument. Return
+        the new Job, or None if the queue is full, in which case only the
+        keys which are already pending can be scheduled (no pending job
+        is ever dropped for another key).
+        """
+
+        delay = kwargs.pop("delay", self.delay)
+        self.start()
+        with self.condition:
+            if self.stopped:
+                return None
+            if key not in self.pending and \
+                    len(self.pending) >= self.queue_size:
+                Metrics().count("scheduler.refused")
+                return None
+            # Every job carries a generation number which grows for each
+            # new request for the same key.
+            generation = self.generations.get(key, 0) + 1
+            self.generations[key] = generation
+            job = Job(key, func, args, kwargs, time.time() + delay,
+                      generation, self)
+            job.args = (job,) + args
+            # Coalesce with the pending job for the same key.
+            if self.pending.pop(key, None):
+                Metrics().count("scheduler.coalesced")
+            # Supersede the job which is running for the same key.
+            running = self.running.get(key)
+            self.pending[key] = job
+            self.condition.notify_all()
+        if running:
+            Metrics().count("scheduler.superseded")
+            running.cancel()
+        return job
+
+    def get_generation(self, key):
+        """Return the generation of the last job scheduled for a key."""
+
+        # Reading a single dict item needs no lock.
+        return self.generations.get(key, 0)
+
+    def cancel(self, key):
+        """Cancel the pending and running jobs for a key."""
+
+        with self.condition:
+            self.pending.pop(key, None)
+            self.generations.pop(key, None)
+            running = self.running.get(key)
+        if running:
+            running.cancel()
+
+    def stop(self):
+        """Cancel every job and stop the worker threads.
+
+        A stopped scheduler refuses any new job.
+        """
+
+        with self.condition:
+            self.stopped = True
+            self.pending.clear()
+            self.generations.clear()
+            running = list(self.running.values())
+            self.condition.notify_all()
+        for job in running:
+            job.cancel()
+
+    def _next_job(self):
+        """Wait for the next job whose debounce window is over.
+
+        Return None once the scheduler is stopped.
+        """
+
+        with self.condition:
+            while True:
+                if self.stopped:
+                    return None
+                now = time.time()
+                ready = [x for x in self.pending.values()
+                         if x.due <= now and x.key not in self.running]
+                if ready:
+                    job = min(ready, key=lambda x: x.due)
+                    del self.pending[job.key]
+                    self.running[job.key] = job
+                    return job
+                # Sleep until the earliest pending job is due.
+                waiting = [x.due for x in self.pending.values()
+                           if x.key not in self.running]
+                timeout = max(min(waiting) - now, 0) if waiting else None
+                self.condition.wait(timeout)
+
+    def _work(self):
+        """Worker thread loop."""
+
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            # Time spent in the queue once the debounce window is over.
+            Metrics().observe("scheduler.wait", time.time() - job.due)
+            try:
+                job.run()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    if self.running.get(job.key) is job:
+                        del self.running[job.key]
+                    self.condition.notify_all()
@@ -3,6 +3,7 @@
 Store the plugin's preferences dialog controller.
 """
 
+from .. _metrics import Metrics
 from . model import Configuration
 from . view import View
 
@@ -13,48 +14,71 @@ class Controller(object):
     def __init__(self):
         """Run when creating a new instance of Controller."""
 
-        # Load options from json file and preferences dialog.
+        # Load options from the shared configuration and preferences dialog.
         self.conf = Configuration()
         self.view = View()
 
         for page in self.view.get_children():
 
             if page.name == "General":
-                # Get property "location".
-                db_g = self.conf.load(page.name)
-                try:
-                    db_g.location
-                except AttributeError:
-                    db_g.location = True
-                # Set page elements.
-                page.combo_location.set_active(db_g.location)
+                # Set page elements from property "location".
+                page.combo_location.set_active(
+                    self.conf.get(page.name, "location", True))
                 page.combo_location.connect(
                     "changed", self.on_combo_location_changed)
+            elif page.name == "Metrics":
+                # Show the current metrics and handle their buttons.
+                page.set_metrics(Metrics().to_dict())
+                page.button_refresh.connect(
+                    "clicked", self.on_button_refresh_clicked)
+                page.button_reset.connect(
+                    "clicked", self.on_button_reset_clicked)
+                page.button_export.connect(
+                    "clicked", self.on_button_export_clicked)
             else:
-                # Get property "enable".
-                db_c = self.conf.load(page.name)
-                try:
-                    db_c.enable
-                except AttributeError:
-                    db_c.enable = True
-                # Set page elements.
-                page.check_enable.set_active(db_c.enable)
-                page.check_enable.connect(
-                    "toggled", self.on_check_enable_toggled)
+                # Set page elements from the boolean checker options.
+                for key, check in page.checks.items():
+                    check.set_active(self.conf.get(page.name, key, True))
+                    check.connect("toggled", self.on_check_toggled)
 
         # Create handlers.
         self.view.connect("destroy", self.on_close)
 
-    def on_check_enable_toggled(self, check_enable):
-        """Trigger when the enable check is toggled."""
+    def on_check_toggled(self, check):
+        """Trigger when the check of a checker option is toggled."""
 
-        page = check_enable.get_parent()
-        db_c = self.conf.load(page.name)
-        db_c.enable = not db_c.enable
+        page = check.get_parent()
+        self.conf.set(page.name, check.key, check.get_active())
+
+    def on_button_refresh_clicked(self, button):
+        """Trigger when the button to refresh the metrics is clicked."""
+
+        page = button.get_parent().get_parent()
+        page.set_metrics(Metrics().to_dict())
+
+    def on_button_reset_clicked(self, button):
+        """Trigger when the button to reset the metrics is clicked."""
+
+        page = button.get_parent().get_parent()
+        Metrics().reset()
+        page.set_metrics(Metrics().to_dict())
+
+    def on_button_export_clicked(self, button):
+        """Trigger when the button to export the metrics is clicked."""
+
+        page = button.get_parent().get_parent()
+        # The export includes the versions of the checkers which have run
+        # (recorded by the engine), so it never waits for a checker command.
+        try:
+            Metrics().export(Configuration.METRICS_PATH)
+            page.label_export.set_text(Configuration.METRICS_PATH)
+        except OSError as err:
+            page.label_export.set_text(str(err))
 
     def on_close(self, *args):
         """Trigger when the preferences dialog is closed."""
 
+        # Write pending changes at once instead of waiting for the delay.
         self.conf.save()
         self.conf = None
 
@@ -62,8 +86,7 @@ class Controller(object):
         """Trigger when the combobox for location is changed."""
 
         page = combo_location.get_parent().get_parent()
-        db_g = self.conf.load(page.name)
         # Update property "location".
         active_iter = combo_location.get_active_iter()
-        db_g.location = combo_location.get_model()[active_iter][0]
-
+        self.conf.set(page.name, "location",
+                      combo_location.get_model()[active_iter][0])
@@ -5,7 +5,10 @@ Store the plugin classes which handle the plugin's configuration file.
 
 import os
 import json
- 
+import tempfile
+from threading import RLock
+from threading import Timer
+
 
 class Dictionary(object):
     """Generic object which can import and export attributes using dicts."""
@@ -71,48 +74,185 @@ class Dictionary(object):
 
 
 class Configuration(Dictionary):
-    """Parser for the plugin's configuration file."""
+    """Parser for the plugin's configuration file.
+
+    Every registered checker gets a section with its own default values
+    (see get_default), next to the sections of DEFAULT. The default
+    pipeline runs the registered checkers by cost class.
+    """
 
     DEFAULT = {
         "General": {
             "location": True,
+            "buffer": False,
         },
-        "Pep8": {
-            "enable": True,
+        "Scheduler": {
+            "delay": 0.3,
+            "queue_size": 16,
+            "workers": 2,
         },
-        "PyLint": {
+        "Cache": {
             "enable": True,
-        }
+            "memory_size": 256,
+            "disk_size": 2048,
+        },
+        "Project": {
+            "ignore": ".git,.hg,.svn,.tox,.venv,venv,__pycache__,build,"
+                      "dist,*.egg-info",
+            "batch_size": 20,
+            "jobs": 0,
+            "incremental": True,
+        },
+        "Governor": {
+            "max_processes": 2,
+            "nice": 10,
+            "memory_limit": 1024,
+            "cpu_limit": 120,
+            "timeout": 60,
+            "max_load": 1.0,
+        },
     }
 
     JSON_FOLD = os.path.expanduser("~/.config/gedit/plugins/pythonchecker")
     JSON_NAME = "config.json"
     JSON_PATH = os.path.join(JSON_FOLD, JSON_NAME)
+    CACHE_FOLD = os.path.join(JSON_FOLD, "cache")
+    INDEX_FOLD = os.path.join(JSON_FOLD, "index")
+    METRICS_PATH = os.path.join(JSON_FOLD, "metrics.json")
+
+    # Delay (in seconds) before writing pending changes into the file.
+    SAVE_DELAY = 1.0
+
+    # The configuration is a process-wide store: every Configuration()
+    # call returns the same instance, loaded from file only once. Its
+    # internal state is stored in the class since the instance __dict__
+    # only holds the configuration sections.
+    _instance = None
+    _listeners = []
+    _lock = RLock()
+    _timer = None
+
+    def __new__(cls):
+        """Return the shared Configuration instance."""
+
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(Configuration, cls).__new__(cls)
+                super(Configuration, cls._instance).__init__()
+                cls._instance.open()
+            return cls._instance
 
     def __init__(self):
         """Run when creating a new Configuration instance."""
 
-        super(Configuration, self).__init__()
-        self.open()
+        # Everything is done once by __new__.
+        pass
 
     def open(self):
         """Open configuration attributes from file into the object."""
 
-        self.from_dict(self.DEFAULT)
-        if not os.path.exists(self.JSON_PATH):
-            self.save()
-        else:
-            with open(self.JSON_PATH, "r") as json_file:
-                try:
-                    self.from_dict(json.load(json_file))
-                except ValueError:
-                    self.save()
+        with self._lock:
+            self.from_dict(self.get_default())
+            if not os.path.exists(self.JSON_PATH):
+                self.save()
+            else:
+                with open(self.JSON_PATH, "r") as json_file:
+                    try:
+                        self.from_dict(self.merge(json.load(json_file)))
+                    except (TypeError, ValueError):
+                        self.save()
+
+    def get(self, section, key, default=None):
+        """Return the value of a key within a section."""
+
+        with self._lock:
+            try:
+                return getattr(self.load(section), key)
+            except (AttributeError, TypeError):
+                return default
+
+    def set(self, section, key, value):
+        """Change the value of a key, notify listeners and save later."""
+
+        with self._lock:
+            db_s = self.load(section)
+            if getattr(db_s, key, None) == value:
+                return
+            setattr(db_s, key, value)
+            self.save_later()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(section, key, value)
+
+    def connect(self, callback):
+        """Register a callback(section, key, value) for value changes."""
+
+        with self._lock:
+            self._listeners.append(callback)
+
+    def disconnect(self, callback):
+        """Unregister a callback for value changes."""
+
+        with self._lock:
+            try:
+                self._listeners.remove(callback)
+            except ValueError:
+                pass
+
+    def save_later(self):
+        """Schedule a save, coalescing the changes done meanwhile."""
+
+        with self._lock:
+            if Configuration._timer is None:
+                Configuration._timer = Timer(self.SAVE_DELAY, self.save)
+                Configuration._timer.daemon = True
+                Configuration._timer.start()
+
+    @classmethod
+    def get_default(cls):
+        """Return the default sections, including those of the checkers."""
+
+        # The checkers are only imported here, so importing the conf
+        # package stays cheap.
+        from .. main.model import CHECKERS
+        from .. main.model import get_default_pipeline
+
+        out = dict((key, dict(val)) for key, val in cls.DEFAULT.items())
+        out["General"].setdefault("pipeline", get_default_pipeline())
+        for name, checker in CHECKERS.items():
+            out.setdefault(name, dict(checker.DEFAULTS))
+        return out
+
+    def merge(self, dictionary):
+        """Return the default sections updated with the values of a dict."""
+
+        out = self.get_default()
+        for key, val in dictionary.items():
+            if isinstance(val, dict) and isinstance(out.get(key), dict):
+                out[key].update(val)
+            else:
+                out[key] = val
+        return out
 
     def save(self):
-        """Save configuration attributes from object into the file."""
+        """Save configuration attributes from object into the file.
 
-        if not os.path.exists(self.JSON_FOLD):
-            os.makedirs(self.JSON_FOLD)
-        with open(self.JSON_PATH, "w") as json_file:
-            json.dump(self.to_dict(), json_file, indent=4)
+        The file is replaced atomically, so readers never see it partially
+        written.
+        """
 
+        with self._lock:
+            if Configuration._timer is not None:
+                Configuration._timer.cancel()
+                Configuration._timer = None
+            content = json.dumps(self.to_dict(), indent=4)
+            if not os.path.exists(self.JSON_FOLD):
+                os.makedirs(self.JSON_FOLD)
+            fd, tmppath = tempfile.mkstemp(dir=self.JSON_FOLD, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as json_file:
+                    json_file.write(content)
+                os.replace(tmppath, self.JSON_PATH)
+            except OSError:
+                os.remove(tmppath)
+                raise
@@ -55,11 +55,15 @@ class PageGeneral(Page):
 
 
 class PageChecker(Page):
-    """Page oriented to checker preferences."""
+    """Page oriented to checker preferences.
+
+    The page has a check button for every boolean option of the checker
+    class, stored in the checks dictionary by option name.
+    """
 
     __gtype_name__ = "PythonChecker_Conf_PageChecker"
 
-    def __init__(self, name):
+    def __init__(self, name, checker):
         """Run when creating a new PageChecker instance."""
 
         super(PageChecker, self).__init__(name)
@@ -67,7 +71,70 @@ class PageChecker(Page):
         # Set check button which enables or disables the checker.
         label = "Enable {} checker".format(name)
         self.check_enable = Gtk.CheckButton(label)
+        self.check_enable.key = "enable"
         self.pack_start(self.check_enable, True, True, 0)
+        self.checks = {"enable": self.check_enable}
+
+        # Set check buttons for the other boolean options.
+        for key, val in checker.DEFAULTS.items():
+            if key == "enable" or not isinstance(val, bool):
+                continue
+            check = Gtk.CheckButton(checker.LABELS.get(key, key))
+            check.key = key
+            self.pack_start(check, True, True, 0)
+            self.checks[key] = check
+
+
+class PageMetrics(Page):
+    """Page oriented to the performance metrics of the plugin."""
+
+    __gtype_name__ = "PythonChecker_Conf_PageMetrics"
+
+    COLUMNS = ["Metric", "Count", "Mean (ms)", "P95 (ms)", "Max (ms)"]
+
+    def __init__(self, name):
+        """Run when creating a new PageMetrics instance."""
+
+        super(PageMetrics, self).__init__(name)
+
+        # Set the table with a row for every counter and histogram.
+        self.store = Gtk.ListStore(*[str for _ in self.COLUMNS])
+        treeview = Gtk.TreeView(model=self.store)
+        for i, title in enumerate(self.COLUMNS):
+            renderer = Gtk.CellRendererText()
+            column = Gtk.TreeViewColumn(title, renderer, text=i)
+            column.set_sort_column_id(i)
+            treeview.append_column(column)
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_min_content_height(240)
+        scrolled.add(treeview)
+        self.pack_start(scrolled, True, True, 0)
+
+        # Set the buttons to refresh, reset and export the metrics.
+        self.button_refresh = Gtk.Button(label="Refresh")
+        self.button_reset = Gtk.Button(label="Reset")
+        self.button_export = Gtk.Button(label="Export as JSON")
+        self.label_export = Gtk.Label("")
+        hbox = Gtk.Box(orientation=self.HORIZONTAL, spacing=5)
+        hbox.pack_start(self.button_refresh, False, False, 0)
+        hbox.pack_start(self.button_reset, False, False, 0)
+        hbox.pack_start(self.button_export, False, False, 0)
+        hbox.pack_end(self.label_export, True, True, 0)
+        self.pack_start(hbox, False, False, 5)
+
+    def set_metrics(self, metrics):
+        """Fill the table from a dictionary given by Metrics.to_dict."""
+
+        def millis(x):
+            """Return a duration in seconds as a string in milliseconds."""
+            return "" if x is None else "{:.1f}".format(x * 1000)
+
+        self.store.clear()
+        for key, val in sorted(metrics["counters"].items()):
+            self.store.append([key, str(val), "", "", ""])
+        for key, val in sorted(metrics["histograms"].items()):
+            self.store.append([key, str(val["count"]), millis(val["mean"]),
+                               millis(val["p95"]), millis(val["max"])])
 
 
 class View(Gtk.Notebook):
@@ -78,17 +145,22 @@ class View(Gtk.Notebook):
     def __init__(self):
         """Run when creating a new View instance."""
 
+        from .. main.model import CHECKERS
+
         super(View, self).__init__()
 
         name0 = "General"
         self.page0 = PageGeneral(name0)
         self.append_page(self.page0, Gtk.Label(name0))
 
-        name1 = "Pep8"
-        self.page1 = PageChecker(name1)
-        self.append_page(self.page1, Gtk.Label(name1))
+        # Add a page for every registered checker.
+        self.checker_pages = []
+        for name, checker in CHECKERS.items():
+            page = PageChecker(name, checker)
+            self.append_page(page, Gtk.Label(name))
+            self.checker_pages.append(page)
 
-        name2 = "PyLint"
-        self.page2 = PageChecker(name2)
-        self.append_page(self.page2, Gtk.Label(name2))
+        name_metrics = "Metrics"
+        self.page_metrics = PageMetrics(name_metrics)
+        self.append_page(self.page_metrics, Gtk.Label(name_metrics))
 
@@ -0,0 +1,128 @@
+"""main/_pylint_worker.py
+
+Standalone script which keeps PyLint loaded in memory for PyLintServer.
+
+Every request is read from stdin as a JSON line with the keys "filepath",
+"args" and "content" (the unsaved buffer text or null), and every response
+is written to stdout as a JSON line with the key "output" (or "error" if
+the check could not be completed).
+"""
+
+import json
+import os
+import sys
+from io import BytesIO
+from io import StringIO
+from io import TextIOWrapper
+
+
+# Modification stamps (mtime and size) of the module files within the
+# astroid cache, taken once the modules have been inferred.
+STAMPS = {}
+
+
+def get_stamp(path):
+    """Return the modification stamp of a file or None if it is missing."""
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def forget_modules(filepath):
+    """Remove the checked file and the changed modules from the astroid cache.
+
+    Astroid keeps the imported modules by name and never reads their files
+    again, so the modules whose file has changed (or vanished) since they
+    were inferred are removed to be inferred again.
+    """
+
+    try:
+        from astroid import MANAGER
+    except ImportError:
+        return
+    filepath = os.path.abspath(filepath)
+    for name, module in list(MANAGER.astroid_cache.items()):
+        modpath = getattr(module, "file", None)
+        if not modpath:
+            continue
+        modpath = os.path.abspath(modpath)
+        if modpath == filepath or modpath in STAMPS and \
+                get_stamp(modpath) != STAMPS[modpath]:
+            del MANAGER.astroid_cache[name]
+            STAMPS.pop(modpath, None)
+
+
+def remember_modules():
+    """Take the stamps of the modules inferred by the last check."""
+
+    try:
+        from astroid import MANAGER
+    except ImportError:
+        return
+    for module in list(MANAGER.astroid_cache.values()):
+        modpath = getattr(module, "file", None)
+        if modpath:
+            modpath = os.path.abspath(modpath)
+            if modpath not in STAMPS:
+                STAMPS[modpath] = get_stamp(modpath)
+
+
+def check(filepath, args, content=None):
+    """Call PyLint in the current process and return the output log."""
+
+    from pylint.lint import Run
+    from pylint.reporters.text import TextReporter
+
+    out_result = StringIO()
+    if "--output-format=json" in args:
+        try:
+            from pylint.reporters.json_reporter import JSONReporter
+        except ImportError:
+            from pylint.reporters.json import JSONReporter
+        reporter = JSONReporter(out_result)
+    else:
+        reporter = TextReporter(out_result)
+
+    forget_modules(filepath)
+    if content is None:
+        args = [filepath] + args
+    else:
+        # PyLint reads the module content from stdin with "--from-stdin".
+        args = ["--from-stdin", filepath] + args
+        sys.stdin = TextIOWrapper(
+            BytesIO(content.encode(encoding="UTF-8")), encoding="UTF-8")
+    try:
+        Run(args, reporter=reporter, exit=False)
+    finally:
+        remember_modules()
+
+    return out_result.getvalue()
+
+
+def main():
+    """Serve check requests until stdin is closed."""
+
+    # Keep private channels for requests and responses, so that neither
+    # the output of PyLint nor the stdin swap for unsaved buffers can break
+    # the protocol.
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    sys.stdout = sys.stderr
+    requests = sys.stdin
+
+    for line in iter(requests.readline, ""):
+        try:
+            request = json.loads(line)
+            output = check(request["filepath"], request["args"],
+                           request.get("content"))
+            response = {"output": output}
+        except Exception as err:
+            response = {"error": "{}: {}".format(type(err).__name__, err)}
+        channel.write(json.dumps(response) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    main()
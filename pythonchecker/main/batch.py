@@ -0,0 +1,255 @@
+"""main/batch.py
+
+Store the project-wide batch check, which spreads the Python files of a
+folder over a worker pool. It can also be run from a terminal:
+
+    python3 -m pythonchecker [options] folder
+"""
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+
+from .. conf.model import Configuration
+from . index import ProjectIndex
+from . model import CHECKERS
+
+
+ROOT_MARKERS = [".git", ".hg", ".svn", "setup.py", "pyproject.toml"]
+
+
+def find_project_root(folder):
+    """Return the closest parent folder which looks like a project root."""
+
+    current = os.path.abspath(folder)
+    while True:
+        if any(os.path.exists(os.path.join(current, x))
+               for x in ROOT_MARKERS):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return os.path.abspath(folder)
+        current = parent
+
+
+def check_files(name, filelist):
+    """Check a list of files within a worker thread or process.
+
+    Errors are returned as plain tuples so that they travel cheaply back
+    to the parent process, together with False if the check timed out
+    (every file then gets a timeout error, and the results must not be
+    stored).
+    """
+
+    checker = CHECKERS[name]()
+    results = dict((filepath, []) for filepath in filelist)
+    for filepath, error in checker.check_list_of_files(filelist):
+        filepath = os.path.abspath(filepath)
+        results.setdefault(filepath, []).append(error)
+    complete = not checker.timed_out
+    for filepath, errors in results.items():
+        if not complete:
+            errors.insert(0, checker.get_timeout_error())
+        results[filepath] = checker.dump_errors(errors)
+    return name, results, complete
+
+
+class BatchCheck(object):
+    """Project-wide check spread over a worker pool.
+
+    Workers are threads by default, since they mostly wait for the checker
+    processes and forking the multi-threaded Gedit process is not safe.
+    The command line check, which runs alone, uses worker processes.
+    """
+
+    BATCH_SIZE = 20
+    IGNORE = ".git,.hg,.svn,.tox,.venv,venv,__pycache__,build,dist,*.egg-info"
+
+    def __init__(self, checkers, ignore=None, batch_size=None, jobs=None,
+                 processes=False):
+        """Run when creating a new instance of BatchCheck."""
+
+        ignore = ignore if ignore is not None else self.IGNORE
+        self.checkers = list(checkers)
+        self.ignore = [x.strip() for x in ignore.split(",") if x.strip()]
+        self.batch_size =\
+            batch_size if batch_size is not None else self.BATCH_SIZE
+        self.jobs = jobs or os.cpu_count()
+        self.processes = processes
+        # Error messages of the checkers which could not be run.
+        self.failures = {}
+        self.files = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    def is_ignored(self, name):
+        """Return True if a file or folder name matches an ignore pattern."""
+
+        return any(fnmatch.fnmatch(name, x) for x in self.ignore)
+
+    def walk(self, root):
+        """Yield the Python files within a folder (sorted by path)."""
+
+        for folder, dirnames, filenames in os.walk(os.path.abspath(root)):
+            dirnames[:] = sorted(x for x in dirnames if not self.is_ignored(x))
+            for filename in sorted(filenames):
+                if filename.endswith(".py") and not self.is_ignored(filename):
+                    yield os.path.join(folder, filename)
+
+    def get_targets(self, filelist, index=None):
+        """Return the files which have to be checked by every checker.
+
+        Without an index every file is checked. With an index only the
+        changed files are checked, plus their reverse dependencies for the
+        checkers whose results depend on the imported modules, plus the
+        files without stored results.
+        """
+
+        if index is None:
+            return dict((name, filelist) for name in self.checkers)
+
+        changed = set(index.update(filelist))
+        rdeps = index.get_reverse_dependencies(changed) if changed else set()
+        targets = {}
+        for name in self.checkers:
+            needed = set(changed)
+            if CHECKERS[name].CROSS_MODULE:
+                needed |= rdeps
+            needed |= set(x for x in filelist
+                          if index.get_results(x, name) is None)
+            # Forget old results so an interrupted run checks them again.
+            for filepath in needed:
+                index.drop_results(filepath, name)
+            targets[name] = [x for x in filelist if x in needed]
+        return targets
+
+    def run(self, root, index=None):
+        """Check a folder and yield (filepath, checker name, errors).
+
+        Results are yielded batch by batch as soon as they are ready. If a
+        ProjectIndex is given, unchanged files are not checked again and
+        their stored results are yielded first.
+        """
+
+        start = time.time()
+        filelist = list(self.walk(root))
+        targets = self.get_targets(filelist, index)
+        self.files = len(filelist)
+        self.skipped = len(set(filelist).difference(*targets.values()))
+
+        # Yield the stored results of the files which are not checked.
+        if index is not None:
+            for name in self.checkers:
+                checker = CHECKERS[name]()
+                needed = set(targets[name])
+                for filepath in filelist:
+                    if filepath not in needed:
+                        yield (filepath, name, checker.load_errors(
+                            index.get_results(filepath, name)))
+
+        executor = ProcessPoolExecutor if self.processes else\
+            ThreadPoolExecutor
+        with executor(max_workers=self.jobs) as pool:
+            futures = dict(
+                (pool.submit(check_files, name,
+                             targets[name][i:i + self.batch_size]), name)
+                for name in self.checkers
+                for i in range(0, len(targets[name]), self.batch_size))
+            try:
+                for future in as_completed(futures):
+                    # A failed batch (e.g. the checker command is missing)
+                    # is reported and the other batches go on.
+                    try:
+                        name, results, complete = future.result()
+                    except Exception as err:
+                        self.failures.setdefault(futures[future], str(err))
+                        continue
+                    checker = CHECKERS[name]()
+                    for filepath in sorted(results):
+                        rows = results[filepath]
+                        if index is not None and complete:
+                            index.set_results(filepath, name, rows)
+                        yield filepath, name, checker.load_errors(rows)
+            finally:
+                # Do not start pending batches if the consumer stops.
+                for future in futures:
+                    future.cancel()
+                self.elapsed = time.time() - start
+                if index is not None:
+                    index.save()
+
+    def get_throughput(self):
+        """Return the number of checked files per second.
+
+        The unchanged files skipped thanks to the index are not counted.
+        """
+
+        checked = self.files - self.skipped
+        return checked / self.elapsed if self.elapsed else 0.0
+
+    def get_summary(self):
+        """Return a summary message with the throughput."""
+
+        msg = ("Checked {} of {} files in {:.1f} s ({:.1f} files/sec, "
+               "{} unchanged skipped)")
+        msg = msg.format(self.files - self.skipped, self.files, self.elapsed,
+                         self.get_throughput(), self.skipped)
+        for name, error in sorted(self.failures.items()):
+            msg += "; checker {} unavailable ({})".format(name, error)
+        return msg
+
+
+def main(argv=None):
+    """Run the batch check from the command line."""
+
+    parser = argparse.ArgumentParser(
+        prog="pythonchecker",
+        description="Check all the Python files within a folder.")
+    parser.add_argument(
+        "folder", help="project folder to check")
+    parser.add_argument(
+        "--checkers", default=",".join(sorted(CHECKERS)),
+        help="comma-separated list of checkers (default: %(default)s)")
+    parser.add_argument(
+        "--ignore", default=BatchCheck.IGNORE,
+        help="comma-separated list of ignore patterns (default: %(default)s)")
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="number of worker processes (default: number of cores)")
+    parser.add_argument(
+        "--batch-size", type=int, default=BatchCheck.BATCH_SIZE,
+        help="number of files per checker call (default: %(default)s)")
+    parser.add_argument(
+        "--full", action="store_true",
+        help="check every file instead of only the changed ones")
+    args = parser.parse_args(argv)
+
+    checkers = [x.strip() for x in args.checkers.split(",") if x.strip()]
+    for name in checkers:
+        if name not in CHECKERS:
+            parser.error("unknown checker '{}'".format(name))
+
+    batch = BatchCheck(checkers, ignore=args.ignore,
+                       batch_size=args.batch_size, jobs=args.jobs,
+                       processes=True)
+    if args.full:
+        index = None
+    else:
+        index = ProjectIndex(args.folder, Configuration.INDEX_FOLD)
+    found = 0
+    for filepath, name, errors in batch.run(args.folder, index):
+        for error in errors:
+            print("{}:{}:{}: {} {} [{}]".format(
+                filepath, error.line, error.column,
+                error.code, error.message, name))
+            found += 1
+    print(batch.get_summary(), file=sys.stderr)
+
+    if batch.failures:
+        return 2
+    return 1 if found else 0
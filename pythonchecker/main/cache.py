@@ -0,0 +1,167 @@
+"""main/cache.py
+
+Store the result cache which avoids checking again unchanged files.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+
+
+class ResultCache(object):
+    """Two-tier (memory and disk) LRU cache for checker results.
+
+    Results are keyed on the file content hash together with the checker
+    name, arguments and version, so a key never becomes stale: a changed
+    file or checker just produces a different key. Checkers whose results
+    depend on the imported modules (CROSS_MODULE) are never cached, since
+    those modules are not part of the key.
+
+    The recency order of the disk entries is kept in memory: the folder is
+    only scanned (and sorted by modification time) by the first access.
+    """
+
+    MEMORY_SIZE = 256
+    DISK_SIZE = 2048
+
+    def __init__(self, folder, memory_size=None, disk_size=None):
+        """Run when creating a new instance of ResultCache."""
+
+        self.folder = folder
+        self.memory_size =\
+            memory_size if memory_size is not None else self.MEMORY_SIZE
+        self.disk_size =\
+            disk_size if disk_size is not None else self.DISK_SIZE
+        self.memory = OrderedDict()
+        self.disk = None
+        self.lock = Lock()
+        self.stats = dict.fromkeys(
+            ["memory_hits", "disk_hits", "misses", "evictions"], 0)
+
+    @staticmethod
+    def make_key(content, checker):
+        """Return the cache key for a file content and a checker.
+
+        Return None if the results of the checker cannot be cached.
+        """
+
+        if checker.CROSS_MODULE:
+            return None
+        if isinstance(content, str):
+            content = content.encode("UTF-8")
+        digest = hashlib.sha1(content)
+        digest.update(json.dumps(
+            [checker.NAME, checker.args, checker.get_version()]).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached results for a key or None if missing."""
+
+        with self.lock:
+            # Look into the memory tier first.
+            try:
+                value = self.memory.pop(key)
+            except KeyError:
+                value = None
+            else:
+                self.memory[key] = value
+                self.stats["memory_hits"] += 1
+                return value
+            # Look into the disk tier and promote the entry if found.
+            disk = self._get_disk()
+            if key not in disk:
+                self.stats["misses"] += 1
+                return None
+            path = self._get_path(key)
+            try:
+                with open(path, "r") as json_file:
+                    value = [tuple(x) for x in json.load(json_file)]
+                os.utime(path, None)
+            except (OSError, ValueError):
+                del disk[key]
+                self.stats["misses"] += 1
+                return None
+            disk.move_to_end(key)
+            self.stats["disk_hits"] += 1
+            self._put_in_memory(key, value)
+            return value
+
+    def put(self, key, value, persist=True):
+        """Store the results for a key in both tiers.
+
+        If persist is False, the results are only kept in the memory tier
+        (e.g. those of a buffer being edited, which change every keystroke).
+        """
+
+        value = [tuple(x) for x in value]
+        with self.lock:
+            self._put_in_memory(key, value)
+            if not persist:
+                return
+            disk = self._get_disk()
+            try:
+                with open(self._get_path(key), "w") as json_file:
+                    json.dump(value, json_file)
+            except OSError:
+                return
+            disk.pop(key, None)
+            disk[key] = None
+            self._evict_from_disk()
+
+    def get_stats(self):
+        """Return a copy of the hit/miss counters."""
+
+        with self.lock:
+            stats = dict(self.stats)
+        stats["memory_entries"] = len(self.memory)
+        return stats
+
+    def _get_path(self, key):
+        """Return the path of the disk entry for a key."""
+
+        return os.path.join(self.folder, "{}.json".format(key))
+
+    def _put_in_memory(self, key, value):
+        """Store an entry in the memory tier evicting the oldest ones."""
+
+        self.memory.pop(key, None)
+        self.memory[key] = value
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _get_disk(self):
+        """Return the disk entry keys from the least recently used one.
+
+        The folder is scanned the first time, and created if missing.
+        """
+
+        if self.disk is not None:
+            return self.disk
+        self.disk = OrderedDict()
+        try:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+            entries = []
+            for name in os.listdir(self.folder):
+                if name.endswith(".json"):
+                    path = os.path.join(self.folder, name)
+                    entries.append((os.path.getmtime(path), name[:-5]))
+        except OSError:
+            return self.disk
+        for _, key in sorted(entries):
+            self.disk[key] = None
+        return self.disk
+
+    def _evict_from_disk(self):
+        """Remove the least recently used disk entries above the limit."""
+
+        while len(self.disk) > self.disk_size:
+            key, _ = self.disk.popitem(last=False)
+            try:
+                os.remove(self._get_path(key))
+                self.stats["evictions"] += 1
+            except OSError:
+                pass
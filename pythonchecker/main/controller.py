@@ -3,18 +3,23 @@
 Store the plugin's main controller.
 """
 
-import time
+import os
 from gi.repository import Gedit
 from gi.repository import GObject
 from gi.repository import PeasGtk
 
+from .. _decorators import synchronized_with_glib
 from .. _decorators import threaded_with_glib
-from .. _decorators import threaded_with_python
-from .. conf.controller import Controller as ConfController
+from .. _metrics import Metrics
 from .. conf.model import Configuration
-from . model import CheckerPep8
-from . model import CheckerPyLint
-from . view import View
+from . document import Document
+from . engine import Engine
+from . incremental import EditTracker
+from . incremental import find_region
+
+# The checkers, the views and the rest of the machinery are imported when
+# they are first needed, so that activating the plugin in a window without
+# Python documents stays cheap.
 
 
 class Controller(GObject.Object, Gedit.WindowActivatable,
@@ -24,7 +29,8 @@ class Controller(GObject.Object, Gedit.WindowActivatable,
     __gtype_name__ = "PythonChecker_Main_Controller"
     window = GObject.property(type=Gedit.Window)
 
-    STATUSBAR_MESSAGE_DELAY = 3
+    # Delay (in seconds) before re-checking the regions edited while typing.
+    INCREMENTAL_DELAY = 0.1
 
     def __init__(self):
         """Run when creating a new instance of CheckerController."""
@@ -32,151 +38,444 @@ class Controller(GObject.Object, Gedit.WindowActivatable,
         GObject.threads_init()
         super(Controller, self).__init__()
         self.handlers = []
-        self.errors = {}
+        self.documents = {}
         self.view = None
+        self.project_view = None
+        self.notifier = None
 
     def enable(self):
-        """Add the plugin tab to the window panel."""
+        """Follow the window events to check its Python documents.
 
-        # Create the treeview if it does not exist and check if the treeview
-        # is already within a panel.
-        if not self.view:
-            self.view = View()
-        if self.view.panel:
+        The plugin tab is only added to the window panel once a Python
+        document shows up.
+        """
+
+        if self.handlers:
             self.disable()
 
-        # Read panel location (True: side panel, False: bottom panel).
-        conf = Configuration()
-        db_g = conf.load("General")
-        try:
-            db_g.location
-        except AttributeError:
-            db_g.location = False
-        conf.save()
- 
-        # Add tab to panel.
-        if not db_g.location:
-            panel = self.window.get_side_panel()
-        else:
-            panel = self.window.get_bottom_panel()
-        self.view.add_to_panel(panel)
+        # Share the checking engine with the other windows.
+        Engine().attach(self)
+        # Follow configuration changes.
+        Configuration().connect(self.on_conf_changed)
+        from . notifier import Notifier
+        self.notifier = Notifier(self.window.get_statusbar,
+                                 self.__gtype_name__)
 
         # Create handlers.
         window = self.window
         call = window.connect("tab-added", self.on_tab_added)
         self.handlers.append((window, call))
-        call = window.connect("tab-removed", self.update_panel)
+        call = window.connect("tab-removed", self.on_tab_removed)
         self.handlers.append((window, call))
         call = window.connect("active-tab-changed", self.update_panel)
         self.handlers.append((window, call))
 
+        # Follow the documents which are already open.
+        for doc in window.get_documents():
+            self.add_document(doc)
+            self.update_errors(doc)
+
     def disable(self):
         """Remove the plugin tab from the window panel."""
 
-        if self.view:
-            # Remove tab from panel.
-            self.view.remove_from_panel()
-            # Remove handlers.
-            for obj, handler in self.handlers:
-                obj.disconnect(handler)
+        # Remove tabs from panel.
+        for view in (self.view, self.project_view):
+            if view:
+                view.remove_from_panel()
+        # Remove handlers and release the documents.
+        for obj, handler in self.handlers:
+            obj.disconnect(handler)
+        self.handlers = []
+        for state in self.documents.values():
+            self.release_document(state)
+        self.documents.clear()
+        Configuration().disconnect(self.on_conf_changed)
+        if self.notifier:
+            self.notifier.stop()
+        # Shut the engine down if no other window uses it.
+        Engine().detach(self)
+
+    def get_view(self):
+        """Return the plugin tab, adding it to the window panel if needed."""
+
+        if not self.view:
+            from . view import View
+            self.view = View()
+            self.view.connect("check-project", self.on_check_project)
+        if not self.view.panel:
+            self.view.add_to_panel(self.get_panel())
+        return self.view
+
+    @staticmethod
+    def is_python(doc):
+        """Return True if a document is written in Python."""
+
+        lang = doc.get_language()
+        return bool(lang and lang.get_name() in "Python 3")
+
+    def get_panel(self):
+        """Return the window panel set in the configuration."""
+
+        # Read panel location (False: side panel, True: bottom panel).
+        if not Configuration().get("General", "location", False):
+            return self.window.get_side_panel()
+        else:
+            return self.window.get_bottom_panel()
+
+    def on_conf_changed(self, section, key, value):
+        """Trigger when a configuration value is changed."""
+
+        # Move the plugin tabs if the panel location has changed.
+        if (section, key) == ("General", "location") and self.view and\
+                self.view.panel:
+            panel = self.get_panel()
+            for view in (self.view, self.project_view):
+                if view and view.panel:
+                    view.remove_from_panel()
+                    view.add_to_panel(panel)
 
     def configure(self):
         """Load a dialog to set plugin preferences."""
 
+        from .. conf.controller import Controller as ConfController
+
         conf_controller = ConfController()
         return conf_controller.view
 
+    def on_check_project(self, *args):
+        """Trigger when a project check is requested from the panel."""
+
+        doc = self.window.get_active_document()
+        if doc:
+            filepath = doc.get_uri_for_display()
+            if filepath.startswith("/"):
+                from . batch import find_project_root
+                root = find_project_root(os.path.dirname(filepath))
+                self.check_project(root)
+
+    def check_project(self, root):
+        """Check all the Python files within a project folder."""
+
+        # Create the project tab next to the plugin tab if needed.
+        if not self.project_view:
+            from . view import ProjectView
+            self.project_view = ProjectView()
+        if not self.project_view.panel:
+            self.project_view.add_to_panel(self.get_view().panel)
+        Engine().get_project_scheduler().schedule(
+            "project:{}:{}".format(id(self), root), self.check_project_job,
+            root)
+
+    def check_project_job(self, job, root):
+        """Check a project folder and stream the results into its tab."""
+
+        from . batch import BatchCheck
+        from . governor import Governor
+        from . index import ProjectIndex
+        from . model import CHECKERS
+
+        # Filter by activated checkers in the preferences values.
+        conf = Configuration()
+        checkers = [name for name in CHECKERS
+                    if conf.get(name, "enable", True)]
+        batch = BatchCheck(checkers,
+                           ignore=conf.get("Project", "ignore"),
+                           batch_size=conf.get("Project", "batch_size"),
+                           jobs=conf.get("Project", "jobs") or
+                           Governor().get_capacity())
+        if conf.get("Project", "incremental", True):
+            index = ProjectIndex(root, Configuration.INDEX_FOLD)
+        else:
+            index = None
+
+        self.project_view.clear(root)
+        key = "project:{}".format(root)
+        self.notifier.task_started(key, "project {}".format(root))
+        done = set()
+        for filepath, name, errors in batch.run(root, index):
+            # Stop if a newer check of the same project has been requested.
+            if job.is_cancelled():
+                self.notifier.task_finished(key)
+                return
+            self.project_view.append(filepath, errors)
+            done.add(filepath)
+            self.notifier.set_detail(
+                "{}/{} files".format(len(done), batch.files))
+        self.notifier.task_finished(key, batch.get_summary())
+
     def on_tab_added(self, window, tab, *args):
         """Trigger when a tab is added."""
 
-        # Create document event connections.
-        doc = tab.get_document()
-        call = doc.connect("loaded", self.update_errors)
-        self.handlers.append((doc, call))
-        call = doc.connect("saved", self.update_errors)
-        self.handlers.append((doc, call))
+        self.add_document(tab.get_document())
+
+    def add_document(self, doc):
+        """Create the state of a document and its event connections."""
+
+        state = Document(doc)
+        self.documents[doc] = state
+        state.connect("loaded", self.update_errors)
+        state.connect("saved", self.update_errors)
+        state.connect("changed", self.on_doc_changed)
+        state.connect("insert-text", self.on_insert_text)
+        state.connect("delete-range", self.on_delete_range)
+
+    def on_tab_removed(self, window, tab, *args):
+        """Trigger when a tab is removed."""
+
+        # Stop any check of the document and drop its state.
+        state = self.documents.pop(tab.get_document(), None)
+        if state is not None:
+            if self.view:
+                self.view.forget(state.get_filepath())
+            self.release_document(state)
+        self.update_panel()
+
+    def release_document(self, state):
+        """Release the state of a document and its engine subscription."""
+
+        if state.subscription is not None:
+            Engine().unsubscribe(state.subscription, self)
+            self.notifier.task_finished(state.subscription)
+            state.subscription = None
+        state.release(self.get_scheduler())
+
+    def on_doc_changed(self, doc, *args):
+        """Trigger when the document buffer is changed."""
+
+        # Check while typing only if the live buffer has to be checked.
+        if Configuration().get("General", "buffer", False):
+            self.update_errors(doc, changed=True)
+
+    def on_insert_text(self, doc, location, text, *args):
+        """Trigger before a text is inserted into the document buffer."""
 
-    @threaded_with_python
-    def update_errors(self, *args):
-        """Update the error list model based on the doc analysis."""
+        state = self.get_checked_state(doc)
+        if state is not None:
+            line, nlines = location.get_line(), text.count("\n")
+            if self.schedule_region_check(state):
+                state.tracker.insert(line, nlines)
+            self.shift_errors(state, line, nlines)
+
+    def on_delete_range(self, doc, start, end):
+        """Trigger before a text is deleted from the document buffer."""
+
+        state = self.get_checked_state(doc)
+        if state is not None:
+            first, last = start.get_line(), end.get_line()
+            if self.schedule_region_check(state):
+                state.tracker.delete(first, last)
+            self.shift_errors(state, first, first - last)
+
+    def get_checked_state(self, doc):
+        """Return the state of a document which has an error list.
+
+        Return None until a full check has given the document its errors.
+        """
+
+        state = self.documents.get(doc)
+        if state is None or state.errors is None:
+            return None
+        return state
+
+    def schedule_region_check(self, state):
+        """Schedule the check of the edited region of a document.
+
+        Return False if no checker is enabled to check edited regions (the
+        errors are still moved along with the edits).
+        """
+
+        if not self.get_incremental_checkers():
+            return False
+        filepath = state.get_filepath()
+        state.schedule(
+            self.get_scheduler(),
+            "incremental:{}:{}".format(id(state), filepath),
+            self.check_region, state, filepath,
+            delay=self.INCREMENTAL_DELAY)
+        return True
+
+    @staticmethod
+    def get_incremental_checkers():
+        """Return the enabled checker classes which check edited regions.
+
+        Checkers whose in-process module is missing are left out, since
+        they could only check the whole file with their command.
+        """
+
+        from . model import CHECKERS
+
+        conf = Configuration()
+        return [checker for name, checker in CHECKERS.items()
+                if checker.INCREMENTAL and conf.get(name, "enable", True) and
+                conf.get(name, "incremental", True) and
+                checker.can_check_lines()]
+
+    def shift_errors(self, state, line, delta):
+        """Move the errors after an edited line by a number of lines."""
+
+        if delta:
+            EditTracker.shift_errors(state.errors or [], line, delta)
+            self.view.refresh()
+
+    def update_errors(self, doc, *args, changed=False):
+        """Update the error list model based on the doc analysis.
+
+        If changed is True, the document is being edited, so only the fast
+        checkers run until it is idle.
+        """
 
         # Get the document language and proceed only for Python files.
-        doc = args[0]
-        lang = doc.get_language()
-        if lang and lang.get_name() in "Python 3":
-            filepath = doc.get_uri_for_display()
-            filename = doc.get_short_name_for_display()
-            # Update statusbar message.
-            msg = "Checking code in {}".format(filename)
-            self.update_statusbar(msg, life=0)
-            # Filter by activated checkers in the preferences values.
-            conf = Configuration()
-            checkers = [CheckerPep8(), CheckerPyLint()]
-            for c in checkers[::-1]:
-                db_c = conf.load(c.NAME)
-                try:
-                    db_c.enable
-                except AttributeError:
-                    db_c.enable = True
-                if not db_c.enable:
-                    checkers.remove(c)
-            conf = None
-            # Call the checkers and store the output error instances.
-            errors = (x for c in checkers for x in c.check_file(filepath))
-            errors = sorted(errors, key=lambda x: (x.line, x.column))
-            self.errors[filepath] = errors
-            self.update_panel()
-            # Update statusbar message.
-            msg = "File {} successfully checked".format(filename)
-            self.update_statusbar(msg)
+        state = self.documents.get(doc)
+        if state and self.is_python(doc):
+            self.get_view()
+            filepath = state.get_filepath()
+            # Follow the results of the file (its path may have changed).
+            engine = Engine()
+            if state.subscription != filepath:
+                if state.subscription is not None:
+                    engine.unsubscribe(state.subscription, self)
+                engine.subscribe(filepath, self)
+                state.subscription = filepath
+            # Take the buffer text if the live buffer has to be checked.
+            if Configuration().get("General", "buffer", False):
+                job = engine.check(
+                    filepath, lambda: self.get_document_text(doc), self,
+                    changed)
+            else:
+                job = engine.check(filepath)
+            # Check the document again once its tab is shown if the check
+            # has been refused (the scheduler queue is full).
+            if job is None:
+                state.evicted = True
 
-    @threaded_with_glib
-    def clear_statusbar(self):
-        """Set the statusbar pristine."""
+    def get_states(self, filepath):
+        """Return the states of the documents opened from a file."""
 
-        try:
-            statusbar = self.window.get_statusbar()
-            context_id = statusbar.get_context_id(self.__gtype_name__)
-            statusbar.remove_all(context_id)
-        except AttributeError:
-            pass
+        return [state for state in list(self.documents.values())
+                if state.subscription == filepath]
 
-    @threaded_with_glib
-    def push_to_statusbar(self, message):
-        """Push a message to the statusbar."""
+    def on_check_started(self, filepath):
+        """Trigger when the engine starts checking a file."""
+
+        if self.get_states(filepath):
+            self.notifier.task_started(
+                filepath, "code in {}".format(os.path.basename(filepath)))
 
-        try:
-            statusbar = self.window.get_statusbar()
-            context_id = statusbar.get_context_id(self.__gtype_name__)
-            statusbar.push(context_id, message)
-        except AttributeError:
-            pass
+    def on_check_progress(self, filepath, name, elapsed):
+        """Trigger when a checker has finished with a file."""
 
-    def update_statusbar(self, message, life=None):
-        """Clean and push a message to the statusbar for a certain time."""
+        if self.get_states(filepath):
+            self.notifier.set_detail("{} {:.1f} s".format(name, elapsed))
 
-        life = life if life is not None else self.STATUSBAR_MESSAGE_DELAY
+    def on_check_results(self, filepath, errors):
+        """Trigger when the engine has new errors for a file."""
 
-        self.clear_statusbar()
-        self.push_to_statusbar(message)
-        time.sleep(life)
-        if life:
-            self.clear_statusbar()
+        # Every document gets its own error instances, since they follow
+        # the edits of that document (see shift_errors).
+        for state in self.get_states(filepath):
+            state.set_errors([error.copy() for error in errors])
+        self.update_panel()
 
+    def on_check_finished(self, filepath, message):
+        """Trigger when the engine has finished checking a file."""
+
+        self.notifier.task_finished(filepath, message)
+
+    @staticmethod
+    def get_scheduler():
+        """Return the scheduler of the shared checking engine."""
+
+        return Engine().get_scheduler()
+
+    @synchronized_with_glib
+    def get_document_text(self, doc):
+        """Return the text of the document buffer."""
+
+        start, end = doc.get_bounds()
+        return doc.get_text(start, end, False)
+
+    @synchronized_with_glib
+    def get_edited_region(self, state):
+        """Return (start, stop, prefix, lines, version) for the edited lines.
+
+        The edited lines are expanded to whole top-level statements (see
+        find_region). Return None if there are no edited lines.
+        """
+
+        doc, tracker = state.doc, state.tracker
+        if not tracker.is_dirty():
+            return None
+        first, last = tracker.first, tracker.last
+        nlines = doc.get_line_count()
+
+        def get_line(index):
+            """Return the text of a line including its line break."""
+            start = doc.get_iter_at_line(index)
+            if index + 1 < nlines:
+                end = doc.get_iter_at_line(index + 1)
+            else:
+                end = doc.get_end_iter()
+            return doc.get_text(start, end, False)
+
+        start, stop, prefix = find_region(get_line, nlines, first, last)
+        lines = [get_line(index) for index in range(start, stop)]
+        return start, stop, prefix, lines, tracker.version
+
+    def check_region(self, job, state, filepath):
+        """Re-check the edited region of a document (e.g. with pep8)."""
+
+        region = self.get_edited_region(state)
+        if region is None:
+            return
+        start, stop, prefix, lines, version = region
+        names, errors = set(), []
+        for checker in self.get_incremental_checkers():
+            try:
+                errors.extend(checker.from_conf(Configuration()).check_lines(
+                    prefix + lines, offset=start, context=len(prefix)))
+            except ImportError:
+                # The checker module is not available (only its command).
+                continue
+            names.add(checker.NAME.lower())
+        if names:
+            errors.sort(key=lambda x: (x.line, x.column))
+            self.splice_errors(state, filepath, start, stop, names, errors,
+                               version)
+
+    @threaded_with_glib
+    def splice_errors(self, state, filepath, start, stop, names, errors,
+                      version):
+        """Replace the errors of some checkers within a range of lines."""
+
+        # Drop the results if the document has been edited meanwhile (the
+        # edited lines are kept for the next check) or released.
+        if state.errors is None or not state.tracker.clear(version):
+            return
+        self.view.splice_errors(
+            state.errors, filepath,
+            lambda x: x.type in names and start < x.line <= stop, errors)
+
+    @threaded_with_glib
     def update_panel(self, *args):
         """Clean the panel and show errors from active document."""
 
-        # Clean the panel error list.
-        self.view.clear()
         # Locate the document within the tab if it exists.
+        errors, filepath = [], None
         doc = self.window.get_active_document()
-        if doc:
-            # Get the filepath and update the panel error list.
-            filepath = doc.get_uri_for_display()
-            if filepath.startswith("/"):
-                try:
-                    for error in self.errors[filepath]:
-                        self.view.append(error)
-                except KeyError:
-                    pass
-
+        state = self.documents.get(doc) if doc else None
+        if state:
+            # Get the filepath and its error list (checking the document
+            # again if its results have been dropped to save memory).
+            filepath = state.get_filepath()
+            if state.evicted:
+                state.evicted = False
+                self.update_errors(doc)
+            elif filepath.startswith("/"):
+                state.touch()
+                errors = state.errors or []
+        # Nothing to show until a Python document shows up.
+        if not self.view and not (doc and self.is_python(doc)):
+            return
+        # Swap the panel error list model.
+        with Metrics().timer("panel.update"):
+            self.get_view().set_errors(errors, filepath)
@@ -0,0 +1,85 @@
+"""main/document.py
+
+Store the plugin class which holds the state of every opened document.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+
+from . incremental import EditTracker
+
+
+class Document(object):
+    """State of an opened document: handlers, results and running checks.
+
+    Error lists are kept for at most MAX_RESULTS documents among all the
+    windows. The least recently used ones are dropped and their documents
+    are checked again when they are needed.
+    """
+
+    MAX_RESULTS = 64
+
+    # Documents with an error list, from least to most recently used.
+    _recent = OrderedDict()
+    _lock = Lock()
+
+    def __init__(self, doc):
+        """Run when creating a new instance of Document."""
+
+        self.doc = doc
+        self.handlers = []
+        self.jobs = set()
+        self.errors = None
+        self.evicted = False
+        self.tracker = EditTracker()
+        # Path of the file whose results are received from the engine.
+        self.subscription = None
+
+    def get_filepath(self):
+        """Return the path (or the display name) of the document."""
+
+        return self.doc.get_uri_for_display()
+
+    def connect(self, signal, callback):
+        """Connect a document signal, disconnected on release."""
+
+        self.handlers.append(self.doc.connect(signal, callback))
+
+    def schedule(self, scheduler, key, func, *args, **kwargs):
+        """Schedule a check of the document, cancelled on release."""
+
+        self.jobs.add(key)
+        scheduler.schedule(key, func, *args, **kwargs)
+
+    def set_errors(self, errors):
+        """Store the error list of the document."""
+
+        self.errors = errors
+        self.evicted = False
+        self.touch()
+
+    def touch(self):
+        """Mark the error list as used, dropping the oldest ones if needed."""
+
+        with self._lock:
+            if self.errors is None:
+                return
+            self._recent.pop(self, None)
+            self._recent[self] = None
+            while len(self._recent) > self.MAX_RESULTS:
+                old = self._recent.popitem(last=False)[0]
+                old.errors = None
+                old.evicted = True
+
+    def release(self, scheduler):
+        """Disconnect the handlers, stop the checks and drop the results."""
+
+        for handler in self.handlers:
+            self.doc.disconnect(handler)
+        self.handlers = []
+        for key in self.jobs:
+            scheduler.cancel(key)
+        self.jobs.clear()
+        with self._lock:
+            self._recent.pop(self, None)
+        self.errors = None
@@ -0,0 +1,445 @@
+"""main/engine.py
+
+Store the checking engine shared by all the plugin windows.
+"""
+
+import os
+import time
+import traceback
+from threading import Lock
+from threading import RLock
+
+from .. _metrics import Metrics
+from .. conf.model import Configuration
+
+
+class Engine(object):
+    """Application-level engine which runs the checkers for every window.
+
+    Every Engine() call returns the same instance, which owns the check
+    scheduler, the checker worker pool and the result cache. Windows
+    subscribe to the files they show and receive their results, so a file
+    opened in several windows is only checked once.
+
+    Subscribers must implement on_check_started(filepath),
+    on_check_progress(filepath, name, elapsed) (once a checker is done),
+    on_check_results(filepath, errors) and on_check_finished(filepath,
+    message), where message is None if the check has been cancelled. They
+    are called from worker threads.
+
+    Checks of a buffer being edited only run the checkers whose cost class
+    is "fast", while the whole pipeline runs on load, on save and once the
+    buffer has not been changed for IDLE_DELAY seconds.
+    """
+
+    # Interval (in seconds) between partial updates of a running checker.
+    STREAM_INTERVAL = 0.5
+
+    # Number of threads where the checkers of a stage run at the same time.
+    CHECKER_POOL_SIZE = 4
+
+    # Time (in seconds) without changes before the slow checkers run.
+    IDLE_DELAY = 2.0
+
+    _instance = None
+    _lock = RLock()
+
+    def __new__(cls):
+        """Return the shared Engine instance."""
+
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(Engine, cls).__new__(cls)
+                cls._instance.windows = set()
+                cls._instance.subscribers = {}
+                cls._instance.results = {}
+                cls._instance.scheduler = None
+                cls._instance.project_scheduler = None
+                cls._instance.checker_pool = None
+                cls._instance.result_cache = None
+            return cls._instance
+
+    def attach(self, window):
+        """Register a window (e.g. a plugin controller) using the engine."""
+
+        with self._lock:
+            self.windows.add(window)
+
+    def detach(self, window):
+        """Unregister a window, shutting down the engine after the last."""
+
+        with self._lock:
+            self.windows.discard(window)
+            if not self.windows:
+                self.shutdown()
+
+    def shutdown(self):
+        """Stop the schedulers, the worker pool and the PyLint workers.
+
+        Running checks are cancelled. Everything is started again on
+        demand by the next check.
+        """
+
+        with self._lock:
+            schedulers = [self.scheduler, self.project_scheduler]
+            pool = self.checker_pool
+            self.scheduler = self.project_scheduler = None
+            self.checker_pool = None
+            self.results.clear()
+        for scheduler in schedulers:
+            if scheduler is not None:
+                scheduler.stop()
+        if pool is not None:
+            pool.shutdown(wait=False)
+        from . model import CheckerPyLintServer
+        CheckerPyLintServer.stop_server()
+
+    def subscribe(self, filepath, subscriber):
+        """Send the results of a file to a subscriber."""
+
+        with self._lock:
+            self.subscribers.setdefault(filepath, []).append(subscriber)
+
+    def unsubscribe(self, filepath, subscriber):
+        """Stop sending the results of a file to a subscriber.
+
+        The checks of a file are stopped once it has no subscribers.
+        """
+
+        # Stop the checks of the buffer of the subscriber.
+        key = "{}:{}".format(id(subscriber), filepath)
+        self.cancel(key)
+        with self._lock:
+            subscribers = self.subscribers.get(filepath, [])
+            try:
+                subscribers.remove(subscriber)
+            except ValueError:
+                pass
+            if subscribers:
+                return
+            self.subscribers.pop(filepath, None)
+        self.cancel(filepath)
+
+    def cancel(self, key):
+        """Stop the checks of a key and forget their results."""
+
+        scheduler = self.get_scheduler()
+        scheduler.cancel(key)
+        scheduler.cancel("idle:{}".format(key))
+        with self._lock:
+            self.results.pop(key, None)
+
+    def get_subscribers(self, filepath):
+        """Return the subscribers of a file."""
+
+        with self._lock:
+            return list(self.subscribers.get(filepath, []))
+
+    def check(self, filepath, get_content=None, subscriber=None,
+              changed=False):
+        """Schedule a check of a file.
+
+        Results go to every subscriber of the file. If get_content is
+        given, the text which it returns is checked instead of the file on
+        disk; since that text belongs to the buffer of one window, results
+        only go to the given subscriber. If changed is True (the buffer
+        is being edited), the slow checkers wait until it is idle. Return
+        the scheduled job, or None if the scheduler queue is full.
+        """
+
+        if get_content is None:
+            key, targets = filepath, None
+        else:
+            key = "{}:{}".format(id(subscriber), filepath)
+            targets = [subscriber]
+        scheduler = self.get_scheduler()
+        idle_key = "idle:{}".format(key)
+        # Repeated requests for the same file are coalesced (and a new
+        # change supersedes the check which waits for the idle buffer).
+        if changed:
+            job = scheduler.schedule(
+                key, self.check_file, key, filepath, get_content, targets,
+                time.time(), "fast")
+            scheduler.schedule(
+                idle_key, self.check_file, key, filepath, get_content,
+                targets, time.time(), delay=self.IDLE_DELAY)
+        else:
+            scheduler.cancel(idle_key)
+            job = scheduler.schedule(
+                key, self.check_file, key, filepath, get_content, targets,
+                time.time())
+        return job
+
+    def get_scheduler(self):
+        """Return the shared check scheduler."""
+
+        with self._lock:
+            if self.scheduler is None:
+                from .. _scheduler import Scheduler
+                conf = Configuration()
+                self.scheduler = Scheduler(
+                    delay=conf.get("Scheduler", "delay"),
+                    queue_size=conf.get("Scheduler", "queue_size"),
+                    workers=conf.get("Scheduler", "workers"))
+            return self.scheduler
+
+    def get_project_scheduler(self):
+        """Return the scheduler of the project checks.
+
+        Project checks run on their own worker thread, so a long project
+        check never holds a worker of the document checks.
+        """
+
+        with self._lock:
+            if self.project_scheduler is None:
+                from .. _scheduler import Scheduler
+                self.project_scheduler = Scheduler(delay=0, workers=1)
+            return self.project_scheduler
+
+    def get_checker_pool(self):
+        """Return the shared checker worker pool."""
+
+        with self._lock:
+            if self.checker_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self.checker_pool = ThreadPoolExecutor(
+                    max_workers=self.CHECKER_POOL_SIZE)
+            return self.checker_pool
+
+    def get_cache(self):
+        """Return the shared result cache or None if it is disabled."""
+
+        conf = Configuration()
+        if not conf.get("Cache", "enable", True):
+            return None
+        with self._lock:
+            if self.result_cache is None:
+                from . cache import ResultCache
+                self.result_cache = ResultCache(
+                    Configuration.CACHE_FOLD,
+                    memory_size=conf.get("Cache", "memory_size"),
+                    disk_size=conf.get("Cache", "disk_size"))
+            return self.result_cache
+
+    def check_file(self, job, key, filepath, get_content, targets,
+                   requested, cost=None):
+        """Check a file and send its errors to the subscribers.
+
+        The time when the check was requested is used to measure how long
+        the results take to reach the subscribers. If a cost class is
+        given, only its checkers run and the last errors of the others
+        are kept.
+        """
+
+        def notify(method, *args):
+            """Call a method of every subscriber of the file."""
+            for subscriber in targets or self.get_subscribers(filepath):
+                getattr(subscriber, method)(filepath, *args)
+
+        notify("on_check_started")
+        # The subscribers always get on_check_finished, even if the check
+        # fails, so they do not wait for it forever.
+        msg = "File {} could not be checked".format(
+            os.path.basename(filepath))
+        try:
+            msg = self._check_file(job, key, filepath, get_content, notify,
+                                   requested, cost)
+        finally:
+            notify("on_check_finished", msg)
+
+    def _check_file(self, job, key, filepath, get_content, notify, requested,
+                    cost):
+        """Run the check_file pipeline and return its final message.
+
+        Return None if the check has been cancelled. Checkers which fail
+        (e.g. if their command is missing) are reported and left out.
+        """
+
+        from concurrent.futures import as_completed
+
+        cache = self.get_cache()
+        content = get_content() if get_content is not None else None
+        # Send the checkers of every pipeline stage to the worker pool and
+        # merge the output error instances as they arrive (partial results
+        # are published every STREAM_INTERVAL seconds and at the end of
+        # each checker).
+        lock = Lock()
+        pipeline = self.get_pipeline(cost)
+        names = set(name for stage in pipeline for name in stage)
+        conf = Configuration()
+        with self._lock:
+            last = self.results.setdefault(key, {})
+            results = {}
+            if cost is not None:
+                results = dict((name, errors) for name, errors in last.items()
+                               if name not in names and
+                               conf.get(name, "enable", False))
+        metrics = Metrics()
+
+        def publish(checker, errors):
+            """Merge the errors of a checker into the file error list."""
+            with lock:
+                # Drop the results if a newer check has superseded this one.
+                if job.is_cancelled():
+                    return
+                if not names.intersection(results):
+                    metrics.observe("document.first_result",
+                                    time.time() - requested)
+                results[checker.NAME] = last[checker.NAME] = errors
+                with metrics.timer("document.sort"):
+                    merged = sorted(
+                        (x for found in results.values() for x in found),
+                        key=lambda x: (x.line, x.column))
+                # Deliver under the lock, so an older merged list published
+                # by another checker thread never lands after a newer one
+                # (subscribers must not wait for the GLib main loop here).
+                notify("on_check_results", merged)
+
+        filename = os.path.basename(filepath)
+        msg = "File {} successfully checked".format(filename)
+        failed = []
+        for stage in pipeline:
+            checkers = []
+            for name in stage:
+                try:
+                    checker = self.new_checker(name)
+                except Exception:
+                    traceback.print_exc()
+                    failed.append(name)
+                    continue
+                # Checkers which cannot read the buffer text are skipped.
+                if checker is not None and (content is None or
+                                            checker.STDIN):
+                    checkers.append(checker)
+            # Kill the checker processes if the job becomes stale.
+            for c in checkers:
+                job.add_cancel_callback(c.cancel)
+            start = time.time()
+            futures = dict((self.get_checker_pool().submit(
+                self.run_checker, c, filepath, content, cache, publish), c)
+                for c in checkers)
+            found = {}
+            for future in as_completed(futures):
+                checker = futures[future]
+                try:
+                    found[checker] = future.result()
+                except Exception:
+                    traceback.print_exc()
+                    metrics.count("{}.failed".format(checker.NAME))
+                    failed.append(checker.NAME)
+                    continue
+                notify("on_check_progress", checker.NAME,
+                       time.time() - start)
+            if job.is_cancelled():
+                return None
+            # Skip the next stages if the code cannot even be parsed.
+            if any(c.has_fatal_errors(errors) for c, errors in found.items()):
+                msg = "File {} has syntax errors".format(filename)
+                break
+        metrics.observe("document.latency", time.time() - requested)
+        if failed:
+            msg = "{} ({} failed)".format(msg, ", ".join(failed))
+        return msg
+
+    @staticmethod
+    def get_pipeline(cost=None):
+        """Return the checker names of every pipeline stage.
+
+        The pipeline is set as a string where stages are separated by
+        semicolons and the checkers of a stage (which run at the same
+        time) are separated by commas, e.g. "Syntax;Pep8,PyLint". If a
+        cost class is given, only its registered checkers are kept.
+        """
+
+        from . model import CHECKERS
+
+        pipeline = Configuration().get("General", "pipeline", "")
+        stages = [[name.strip() for name in stage.split(",") if name.strip()]
+                  for stage in pipeline.split(";")]
+        if cost is not None:
+            stages = [[name for name in stage if name in CHECKERS and
+                       CHECKERS[name].COST == cost] for stage in stages]
+        return [stage for stage in stages if stage]
+
+    @staticmethod
+    def new_checker(name):
+        """Return a new checker from its name or None if it is disabled."""
+
+        from . model import CHECKERS
+
+        conf = Configuration()
+        if name not in CHECKERS or not conf.get(name, "enable", False):
+            return None
+        return CHECKERS[name].from_conf(conf)
+
+    @classmethod
+    def run_checker(cls, checker, filepath, content=None, cache=None,
+                    publish=None):
+        """Call a checker and return its output error instances as a list.
+
+        If publish is given, it is called as publish(checker, errors) with
+        the errors found so far while the checker is running, and with the
+        whole list at the end.
+        """
+
+        publish = publish or (lambda checker, errors: None)
+        metrics = Metrics()
+        start = time.time()
+        # Record the checker version for the metrics exports (versions are
+        # cached, so this is only slow the first time).
+        metrics.set_info(checker.NAME, checker.get_version())
+
+        # Look for the results of the same content and checker setup.
+        key = None
+        if cache is not None:
+            try:
+                if content is None:
+                    with open(filepath, "rb") as fileobj:
+                        key = cache.make_key(fileobj.read(), checker)
+                else:
+                    key = cache.make_key(content, checker)
+            except OSError:
+                pass
+        rows = cache.get(key) if key is not None else None
+        if rows is not None:
+            metrics.count("cache.hits")
+            errors = checker.load_errors(rows)
+            publish(checker, errors)
+            return errors
+        if key is not None:
+            metrics.count("cache.misses")
+
+        # Wait for a slot if too many checks of the same class are running,
+        # giving up as soon as the check is cancelled.
+        from . governor import Governor
+        while not checker.SLOTS.acquire(timeout=Governor.POLL_INTERVAL):
+            if checker.cancelled:
+                return []
+        # Stream the errors while the checker is running.
+        errors = []
+        try:
+            last = time.time()
+            for error in checker.check_file(filepath, content):
+                errors.append(error)
+                if time.time() - last > cls.STREAM_INTERVAL:
+                    publish(checker, list(errors))
+                    last = time.time()
+        finally:
+            checker.SLOTS.release()
+        if checker.cancelled:
+            return []
+        if checker.timed_out:
+            # Show what has been found so far, but do not keep it.
+            errors.insert(0, checker.get_timeout_error())
+            publish(checker, errors)
+            return errors
+        metrics.observe("{}.check".format(checker.NAME), time.time() - start)
+        metrics.count("{}.errors".format(checker.NAME), len(errors))
+        publish(checker, errors)
+
+        # The results of a buffer being edited only stay in memory, since
+        # every keystroke makes a new key.
+        if key is not None:
+            cache.put(key, checker.dump_errors(errors),
+                      persist=content is None)
+        return errors
@@ -0,0 +1,141 @@
+"""main/governor.py
+
+Store the plugin class which limits the resources of the checker processes.
+"""
+
+import os
+import time
+from threading import Condition
+from threading import RLock
+from threading import Timer
+
+from .. _metrics import Metrics
+from .. conf.model import Configuration
+
+
+class Governor(object):
+    """Process-wide budget for the checker processes.
+
+    Every Governor() call returns the same instance. A check takes a slot
+    before starting a process, so at most max_processes checker processes
+    run at once, or only one while the load average per core is above
+    max_load. Started processes are reniced and get memory and CPU time
+    limits, and checks which take longer than the timeout are stopped. The
+    limits are set by the Governor configuration section, where zero
+    disables a limit.
+    """
+
+    # Interval (in seconds) between load average readings.
+    LOAD_INTERVAL = 5.0
+
+    # Interval (in seconds) between cancellation checks of waiting checks.
+    POLL_INTERVAL = 0.5
+
+    _instance = None
+    _lock = RLock()
+
+    def __new__(cls):
+        """Return the shared Governor instance."""
+
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(Governor, cls).__new__(cls)
+                cls._instance.condition = Condition()
+                cls._instance.running = 0
+                cls._instance.load = 0.0
+                cls._instance.load_time = 0.0
+            return cls._instance
+
+    def get_load(self):
+        """Return the one-minute load average per core."""
+
+        now = time.time()
+        with self._lock:
+            if now - self.load_time > self.LOAD_INTERVAL:
+                try:
+                    load = os.getloadavg()[0] / (os.cpu_count() or 1)
+                except (AttributeError, OSError):
+                    load = 0.0
+                self.load, self.load_time = load, now
+            return self.load
+
+    def get_capacity(self):
+        """Return the number of checker processes which may run at once."""
+
+        conf = Configuration()
+        capacity = max(conf.get("Governor", "max_processes", 2), 1)
+        max_load = conf.get("Governor", "max_load", 0)
+        if max_load and self.get_load() > max_load:
+            return 1
+        return capacity
+
+    def acquire(self, is_cancelled=None):
+        """Wait for a free process slot.
+
+        Return False (without taking a slot) if is_cancelled is given and
+        it returns True while waiting.
+        """
+
+        start = time.time()
+        with self.condition:
+            while self.running >= self.get_capacity():
+                if is_cancelled and is_cancelled():
+                    return False
+                self.condition.wait(self.POLL_INTERVAL)
+            self.running += 1
+        Metrics().observe("governor.wait", time.time() - start)
+        return True
+
+    def release(self):
+        """Give back a process slot."""
+
+        with self.condition:
+            self.running -= 1
+            self.condition.notify_all()
+
+    def limit(self, pid, cpu=True, scale=1):
+        """Renice a started process and set its memory and CPU limits.
+
+        The CPU time limit is multiplied by scale (e.g. the number of files
+        checked by the process), and it is not set if cpu is False (e.g.
+        for worker processes which serve many checks). Limits which cannot
+        be set on this platform are skipped.
+        """
+
+        conf = Configuration()
+        nice = conf.get("Governor", "nice", 0)
+        memory = conf.get("Governor", "memory_limit", 0)
+        cpu_time = conf.get("Governor", "cpu_limit", 0) * scale if cpu else 0
+        try:
+            if nice:
+                os.setpriority(os.PRIO_PROCESS, pid, nice)
+        except (AttributeError, OSError):
+            pass
+        try:
+            import resource
+            # Memory is given in megabytes and CPU time in seconds.
+            if memory:
+                size = memory * 1024 * 1024
+                resource.prlimit(pid, resource.RLIMIT_AS, (size, size))
+            if cpu_time:
+                resource.prlimit(pid, resource.RLIMIT_CPU,
+                                 (cpu_time, cpu_time + 1))
+        except (AttributeError, ImportError, OSError, ValueError):
+            pass
+
+    def watch(self, checker, scale=1):
+        """Start a timer which stops a check if it takes too long.
+
+        The timeout is multiplied by scale (e.g. the number of files in a
+        batch). The timer is started once the check has a slot, so the
+        time spent waiting for it does not count. Return the timer (to be
+        cancelled once the check is done) or None if there is no timeout.
+        """
+
+        timeout = Configuration().get("Governor", "timeout", 0) * scale
+        if not timeout:
+            return None
+        timer = Timer(timeout, checker.time_out, (timeout,))
+        timer.daemon = True
+        timer.start()
+        return timer
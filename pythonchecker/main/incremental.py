@@ -0,0 +1,149 @@
+"""main/incremental.py
+
+Store the helpers for incremental checking, which re-checks only the
+regions of a document touched by the buffer edits.
+"""
+
+# Keywords which continue a compound statement at the same indentation.
+CONTINUATIONS = ("else", "elif", "except", "finally")
+
+# Number of blank lines kept as context before a region (enough for the
+# blank line checks of pep8, e.g. E302 and E303).
+BLANK_CONTEXT = 3
+
+
+def is_boundary(text, previous=None):
+    """Return True if a line starts a new top-level statement.
+
+    This is a purely lexical guess: the line must not be indented, blank,
+    a comment, a closing bracket or a compound statement continuation,
+    and the previous line must not be a decorator or end with a backslash.
+    """
+
+    if not text.strip() or text[0] in " \t#)]}":
+        return False
+    word = text.split(None, 1)[0].rstrip(":")
+    if word in CONTINUATIONS:
+        return False
+    if previous is not None:
+        previous = previous.rstrip("\r\n")
+        if previous.startswith("@") or previous.endswith("\\"):
+            return False
+    return True
+
+
+def find_region(get_line, nlines, first, last):
+    """Expand a range of edited lines to whole top-level statements.
+
+    get_line(i) returns the text of line i (0-based) and nlines is the
+    number of lines. Return (start, stop, prefix), where [start, stop) is
+    the expanded region and prefix is a list of context lines to check
+    before it (they only give pep8 the blank line and statement context).
+    """
+
+    first = max(min(first, nlines - 1), 0)
+    last = max(min(last, nlines - 1), first)
+
+    # Move up to the beginning of a top-level statement.
+    start = first
+    while start > 0 and\
+            not is_boundary(get_line(start), get_line(start - 1)):
+        start -= 1
+
+    # Move down to the beginning of the next top-level statement.
+    stop = last + 1
+    while stop < nlines and\
+            not is_boundary(get_line(stop), get_line(stop - 1)):
+        stop += 1
+
+    # Keep the preceding blank lines and a placeholder (or the comment) for
+    # the previous statement.
+    prefix = []
+    index = start - 1
+    while index >= 0 and not get_line(index).strip():
+        if len(prefix) < BLANK_CONTEXT:
+            prefix.insert(0, get_line(index))
+        index -= 1
+    if index >= 0:
+        previous = get_line(index)
+        if previous.lstrip().startswith("#") and previous[0] not in " \t":
+            prefix.insert(0, previous)
+        else:
+            prefix.insert(0, "pass\n")
+
+    return start, stop, prefix
+
+
+class EditTracker(object):
+    """Track the lines of a document touched by buffer edits.
+
+    Line numbers are 0-based and refer to the current buffer contents.
+    """
+
+    def __init__(self):
+        """Run when creating a new instance of EditTracker."""
+
+        self.first = None
+        self.last = None
+        self.version = 0
+
+    def is_dirty(self):
+        """Return True if there are edited lines not checked yet."""
+
+        return self.first is not None
+
+    def clear(self, version):
+        """Forget the edited lines if there are no edits after a version.
+
+        Return True if the edited lines have been cleared.
+        """
+
+        if version != self.version:
+            return False
+        self.first = self.last = None
+        return True
+
+    def _extend(self, first, last):
+        """Add a range of lines to the edited ones."""
+
+        self.version += 1
+        if self.first is None:
+            self.first, self.last = first, last
+        else:
+            self.first = min(self.first, first)
+            self.last = max(self.last, last)
+
+    def insert(self, line, nlines):
+        """Record the insertion of nlines line breaks at a line."""
+
+        if self.first is not None and nlines:
+            if self.first > line:
+                self.first += nlines
+            if self.last > line:
+                self.last += nlines
+        self._extend(line, line + nlines)
+
+    def delete(self, first, last):
+        """Record the deletion of the text between two lines."""
+
+        nlines = last - first
+        if self.first is not None and nlines:
+            self.first = self.first - nlines if self.first > last else\
+                min(self.first, first)
+            self.last = self.last - nlines if self.last > last else\
+                min(self.last, first)
+        self._extend(first, first)
+
+    @staticmethod
+    def shift_errors(errors, line, delta):
+        """Shift the errors after a 0-based line by delta lines.
+
+        Errors within deleted lines are moved to the first line kept.
+        """
+
+        if not delta:
+            return
+        line += 1
+        for error in errors:
+            if error.line > line:
+                error.line = max(error.line + delta, line)
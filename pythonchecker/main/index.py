@@ -0,0 +1,184 @@
+"""main/index.py
+
+Store the persisted project index used by incremental project checks.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import tempfile
+
+
+class ProjectIndex(object):
+    """Index with the state, imports and results of every project file.
+
+    Every entry keeps the file mtime, size and content hash, the modules
+    imported by the file (extracted with ast) and the last results of
+    every checker. The index is loaded lazily from a JSON file named after
+    the project root.
+    """
+
+    def __init__(self, root, folder):
+        """Run when creating a new instance of ProjectIndex."""
+
+        self.root = os.path.abspath(root)
+        name = hashlib.sha1(self.root.encode("UTF-8")).hexdigest()
+        self.path = os.path.join(folder, "{}.json".format(name))
+        self._entries = None
+
+    @property
+    def entries(self):
+        """Return the index entries, loading them on first access."""
+
+        if self._entries is None:
+            self.load()
+        return self._entries
+
+    def load(self):
+        """Load the index entries from its JSON file."""
+
+        try:
+            with open(self.path, "r") as json_file:
+                content = json.load(json_file)
+            if content.get("root") != self.root:
+                raise ValueError
+            self._entries = content["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            self._entries = {}
+
+    def save(self):
+        """Write the index entries atomically into its JSON file."""
+
+        folder = os.path.dirname(self.path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        fd, tmppath = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as json_file:
+                json.dump({"root": self.root, "files": self.entries},
+                          json_file)
+            os.replace(tmppath, self.path)
+        except OSError:
+            try:
+                os.remove(tmppath)
+            except OSError:
+                pass
+
+    def get_module_name(self, filepath):
+        """Return the dotted module name of a file relative to the root."""
+
+        relpath = os.path.relpath(filepath, self.root)
+        parts = os.path.splitext(relpath)[0].split(os.sep)
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        return ".".join(parts)
+
+    @staticmethod
+    def parse_imports(content, module, is_package=False):
+        """Return the names of the modules imported by a source code."""
+
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return []
+        package = module.split(".") if is_package else module.split(".")[:-1]
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                # Resolve relative imports against the current package.
+                if node.level:
+                    base = package[:max(len(package) - node.level + 1, 0)]
+                    if node.module:
+                        base = base + node.module.split(".")
+                    base = ".".join(base)
+                else:
+                    base = node.module or ""
+                if base:
+                    names.add(base)
+                for alias in node.names:
+                    names.add("{}.{}".format(base, alias.name).lstrip("."))
+        return sorted(names)
+
+    def update(self, filelist):
+        """Refresh the entries of a list of files and return the changed ones.
+
+        Files whose mtime and size are unchanged are not read at all, and
+        files whose content hash is unchanged are not considered changed.
+        Entries of files which are not in the list any more are removed.
+        """
+
+        changed = []
+        filelist = [os.path.abspath(x) for x in filelist]
+        for filepath in set(self.entries) - set(filelist):
+            del self.entries[filepath]
+
+        for filepath in filelist:
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            entry = self.entries.get(filepath)
+            if entry and entry["mtime"] == stat.st_mtime and\
+                    entry["size"] == stat.st_size:
+                continue
+            with open(filepath, "rb") as fileobj:
+                content = fileobj.read()
+            digest = hashlib.sha1(content).hexdigest()
+            if entry and entry["hash"] == digest:
+                entry["mtime"] = stat.st_mtime
+                continue
+            module = self.get_module_name(filepath)
+            is_package = os.path.basename(filepath) == "__init__.py"
+            self.entries[filepath] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "hash": digest,
+                "module": module,
+                "imports": self.parse_imports(content, module, is_package),
+                "results": {},
+            }
+            changed.append(filepath)
+        return changed
+
+    def get_reverse_dependencies(self, filelist):
+        """Return the files which import (even indirectly) a list of files."""
+
+        importers = {}
+        for filepath, entry in self.entries.items():
+            for name in entry["imports"]:
+                importers.setdefault(name, set()).add(filepath)
+
+        found = set()
+        pending = [os.path.abspath(x) for x in filelist]
+        while pending:
+            entry = self.entries.get(pending.pop())
+            if not entry:
+                continue
+            for filepath in importers.get(entry["module"], ()):
+                if filepath not in found:
+                    found.add(filepath)
+                    pending.append(filepath)
+        return found - set(os.path.abspath(x) for x in filelist)
+
+    def get_results(self, filepath, name):
+        """Return the stored results of a checker for a file or None."""
+
+        entry = self.entries.get(os.path.abspath(filepath))
+        return entry["results"].get(name) if entry else None
+
+    def set_results(self, filepath, name, rows):
+        """Store the results of a checker for a file."""
+
+        entry = self.entries.get(os.path.abspath(filepath))
+        if entry:
+            entry["results"][name] = [list(x) for x in rows]
+
+    def drop_results(self, filepath, name):
+        """Forget the results of a checker for a file."""
+
+        entry = self.entries.get(os.path.abspath(filepath))
+        if entry:
+            entry["results"].pop(name, None)
@@ -4,14 +4,38 @@ Store the plugin model classes (such as the code checkers).
 """
 
 import abc
+import ast
+import json
+import os
 import re
+import signal
+import sys
+import time
+from collections import OrderedDict
 from io import StringIO
+from sys import intern
+from subprocess import DEVNULL
 from subprocess import PIPE
 from subprocess import Popen
+from threading import BoundedSemaphore
+from threading import Lock
+
+from .. _metrics import Metrics
+from . governor import Governor
+from . server import PyLintServerPool
+from . server import ServerError
+from . server import ServerTimeout
 
 
 class CheckerError(object):
-    """Class model for code check errors."""
+    """Class model for code check errors.
+
+    Instances use __slots__ and interned strings, since many of them are
+    kept for every opened file and codes and messages repeat a lot.
+    """
+
+    __slots__ = ("case", "type", "code", "line", "column", "message",
+                 "end_line", "end_column", "symbol", "confidence", "count")
 
     DEFAULT_CASE = "E"
     DEFAULT_TYPE = ""
@@ -25,14 +49,39 @@ class CheckerError(object):
         self.line = self.fit_to_unsigned_integer(line)
         self.column = self.fit_to_unsigned_integer(column)
         self.message = self.fit_to_string(message)
+        # Optional fields given by structured checker outputs.
+        self.end_line = None
+        self.end_column = None
+        self.symbol = None
+        self.confidence = None
+        # Number of identical messages grouped into this instance.
+        self.count = 1
+
+    def set_extra(self, end_line=None, end_column=None, symbol=None,
+                  confidence=None, count=1):
+        """Set the optional fields from structured checker outputs."""
+
+        self.end_line = end_line
+        self.end_column = end_column
+        self.symbol = intern(symbol) if symbol else None
+        self.confidence = intern(confidence) if confidence else None
+        self.count = count
+
+    def copy(self):
+        """Return a copy of the error (e.g. to move it along with edits)."""
+
+        error = CheckerError.__new__(CheckerError)
+        for name in self.__slots__:
+            setattr(error, name, getattr(self, name))
+        return error
 
     @staticmethod
     def fit_to_string(x):
-        """Parse variable to its equivalent string."""
+        """Parse variable to its equivalent (interned) string."""
 
         x = str(x)
         try:
-            return x.replace(x[0], x[0].upper(), 1)
+            return intern(x.replace(x[0], x[0].upper(), 1))
         except IndexError:
             return ""
 
@@ -46,50 +95,319 @@ class CheckerError(object):
             return 1
 
 
+# Checker classes by name, in the order they have been registered.
+CHECKERS = OrderedDict()
+
+# Cost classes of the checkers, from the cheapest one.
+COSTS = ("fast", "slow")
+
+
+def register(cls):
+    """Class decorator which adds a checker to the registry.
+
+    The configuration sections, the preference pages, the check pipeline
+    and the project check find the checkers within the registry (the conf
+    package imports it on first use, when building its defaults).
+    """
+
+    cls.SLOTS = BoundedSemaphore(cls.MAX_INSTANCES)
+    CHECKERS[cls.NAME] = cls
+    return cls
+
+
+def get_default_pipeline():
+    """Return the default pipeline string of the registered checkers.
+
+    There is a stage for every cost class, so the slow checkers only run
+    once the fast ones have found that the code can be parsed.
+    """
+
+    stages = [[name for name, checker in CHECKERS.items()
+               if checker.COST == cost] for cost in COSTS]
+    return ";".join(",".join(stage) for stage in stages if stage)
+
+
 class Checker(object):
     """Abstract class for Python code checkers."""
 
     __metacls__ = abc.ABCMeta
 
     NAME = "Checker"
+    COMMAND = None
+
+    # Cost class: "fast" checkers run on every change of the buffer, while
+    # "slow" ones only run on load, on save or once the buffer is idle.
+    COST = "slow"
+
+    # Maximum number of checks running at the same time, shared by all the
+    # instances of the class (through SLOTS).
+    MAX_INSTANCES = 4
+    SLOTS = BoundedSemaphore(MAX_INSTANCES)
+
+    # True if the code can be given as text instead of a file on disk.
+    STDIN = True
+
+    # True if the checker implements check_lines for the edited regions.
+    INCREMENTAL = False
+
+    # True if the results for a file depend on the modules it imports.
+    CROSS_MODULE = False
+
+    # Code of the error row shown when a check takes too long.
+    TIMEOUT_CODE = "T000"
+
+    # One output line out of PARSE_SAMPLE is timed for the parse metric.
+    PARSE_SAMPLE = 32
+
+    # Default values of the configuration section of the checker and the
+    # labels of its boolean options within the preferences dialog.
+    DEFAULTS = {
+        "enable": True,
+    }
+    LABELS = {}
 
     REGEX = r"({}\w\d*):({}\d*):({}\d*):({}.*)".format(
         "?P<code>", "?P<line>", "?P<column>", "?P<message>")
+    BATCH_REGEX = r"(?P<path>.*?):" + REGEX
+
+    PATTERN = re.compile(REGEX)
+    BATCH_PATTERN = re.compile(BATCH_REGEX)
+
+    def __init__(self):
+        """Run when creating a new instance of Checker."""
+
+        self.cancelled = False
+        self.timed_out = None
+        self.processes = set()
+
+    @classmethod
+    def from_conf(cls, conf):
+        """Return a new checker set up from its configuration section."""
+
+        return cls()
+
+    def cancel(self):
+        """Stop the checker, killing the processes which it has started.
+
+        The output read so far is dropped by the caller.
+        """
+
+        self.cancelled = True
+        Metrics().count("{}.cancelled".format(self.NAME))
+        for call in list(self.processes):
+            self._kill(call)
+
+    def time_out(self, timeout):
+        """Stop a check which has taken more than timeout seconds.
+
+        Unlike a cancelled check, the output read so far is kept and a
+        timeout error is added to it (see get_timeout_error).
+        """
+
+        self.timed_out = timeout
+        Metrics().count("{}.timeouts".format(self.NAME))
+        for call in list(self.processes):
+            self._kill(call)
+
+    def get_timeout_error(self):
+        """Return the error which reports that the check timed out."""
+
+        msg = "{} timed out after {} s, results may be incomplete".format(
+            self.NAME, self.timed_out)
+        return self._new_error(
+            code=self.TIMEOUT_CODE, line=1, column=1, message=msg)
+
+    @staticmethod
+    def _kill(call):
+        """Kill a checker process together with its children."""
+
+        try:
+            os.killpg(call.pid, signal.SIGKILL)
+        except OSError:
+            pass
 
     @abc.abstractmethod
-    def call_checker(self, filepath):
-        """Abstract method with specific instructions for check_file."""
+    def call_checker(self, filepath, content=None):
+        """Abstract method with specific instructions for check_file.
+
+        It must return an iterable over the output log lines. If content
+        is given, it is checked instead of the file on disk and filepath is
+        only used to name the module.
+        """
 
         pass
 
-    def check_file(self, filepath):
-        """Generic method to check Python code."""
+    def check_file(self, filepath, content=None):
+        """Generic method to check Python code.
+
+        CheckerError instances are yielded as soon as the checker reports
+        them, in the order given by the checker.
+        """
+
+        # Transcript every output log line using a regular expression,
+        # timing one line out of PARSE_SAMPLE for the parse metric.
+        parse, sampled, lines = 0.0, 0, 0
+        for line in self.call_checker(filepath, content):
+            timed = lines % self.PARSE_SAMPLE == 0
+            lines += 1
+            if timed:
+                start = time.time()
+            match = self.PATTERN.match(line)
+            error = self._new_error(**match.groupdict()) if match else None
+            if timed:
+                parse += time.time() - start
+                sampled += 1
+            if error:
+                yield error
+        # Estimate the parse time of every line from the sampled ones.
+        if sampled:
+            parse = parse / sampled * lines
+        Metrics().observe("{}.parse".format(self.NAME), parse)
+
+    @classmethod
+    def get_version(cls):
+        """Return the version string of the checker command (cached)."""
 
-        # Call to the specific checker and store the output log.
-        out_result = self.call_checker(filepath)
-        out_result.seek(0)
-        out_result = list(l.strip("\n") for l in out_result.readlines())
+        try:
+            return cls._version
+        except AttributeError:
+            pass
+        try:
+            call = Popen([cls.COMMAND, "--version"], stdout=PIPE, stderr=PIPE)
+            version = call.communicate()[0].decode(encoding="UTF-8").strip()
+        except (OSError, TypeError):
+            version = ""
+        cls._version = version
+        return version
+
+    @classmethod
+    def can_check_lines(cls):
+        """Return True if check_lines can re-check the edited regions."""
+
+        return cls.INCREMENTAL
+
+    def _stream(self, args, content=None, files=1):
+        """Run a checker command and yield its output lines as they arrive.
+
+        If content is given, it is fed to the command through stdin. The
+        process is killed if the consumer stops before the end or if the
+        checker is cancelled. The process waits for a slot of the Governor
+        and gets its resource limits, scaled by the number of files which
+        it checks.
+        """
+
+        governor = Governor()
+        if not governor.acquire(lambda: self.cancelled):
+            return
+        if self.cancelled:
+            governor.release()
+            return
+        metrics = Metrics()
+        start = time.time()
+        stdin = DEVNULL if content is None else PIPE
+        try:
+            call = Popen(args, stdin=stdin, stdout=PIPE, stderr=DEVNULL,
+                         start_new_session=True)
+        except Exception:
+            governor.release()
+            raise
+        self.processes.add(call)
+        governor.limit(call.pid, scale=files)
+        watchdog = governor.watch(self, scale=files)
+        metrics.count("{}.processes".format(self.NAME))
+        metrics.observe("{}.spawn".format(self.NAME), time.time() - start)
+        if self.cancelled or self.timed_out:
+            self._kill(call)
+        try:
+            if content is not None:
+                try:
+                    call.stdin.write(content.encode(encoding="UTF-8"))
+                    call.stdin.close()
+                except BrokenPipeError:
+                    pass
+            first = True
+            for line in call.stdout:
+                if first:
+                    metrics.observe("{}.first_output".format(self.NAME),
+                                    time.time() - start)
+                    first = False
+                yield line.decode(encoding="UTF-8", errors="replace")
+        finally:
+            if call.poll() is None:
+                self._kill(call)
+            call.stdout.close()
+            call.wait()
+            self.processes.discard(call)
+            if watchdog is not None:
+                watchdog.cancel()
+            governor.release()
+            metrics.observe("{}.process".format(self.NAME),
+                            time.time() - start)
+
+    def has_fatal_errors(self, errors):
+        """Return True if a list of errors stops the checker pipeline."""
+
+        return False
+
+    def dump_errors(self, errors):
+        """Export a list of CheckerError instances as plain tuples."""
+
+        return [(e.code, e.line, e.column, e.message, e.end_line,
+                 e.end_column, e.symbol, e.confidence, e.count)
+                for e in errors]
+
+    def load_errors(self, rows):
+        """Import a list of plain tuples as CheckerError instances."""
+
+        errors = []
+        for row in rows:
+            code, line, column, message = row[:4]
+            error = self._new_error(
+                code=code, line=line, column=column, message=message)
+            error.set_extra(*row[4:])
+            errors.append(error)
+        return errors
 
-        # Transcript the error messages using a regular expression.
-        matches = (re.match(self.REGEX, l) for l in out_result)
-        matches = (m for m in matches if m)
+    @staticmethod
+    def group_errors(errors):
+        """Group identical errors into one instance with a counter."""
+
+        groups = {}
+        for error in errors:
+            key = (error.code, error.line, error.column, error.message)
+            try:
+                groups[key].count += 1
+            except KeyError:
+                groups[key] = error
+        return list(groups.values())
 
-        # Yield every CheckerError instance.
-        for match in sorted(matches, key=lambda m: int(m.group("line"))):
-            yield self._new_error(**match.groupdict())
+    def call_checker_list(self, filelist):
+        """Check a list of files and yield log lines prefixed by file paths.
+
+        This generic version calls the checker once per file; subclasses
+        should check all the files within a single invocation.
+        """
+
+        for filepath in filelist:
+            for line in self.call_checker(filepath):
+                yield "{}:{}".format(filepath, line)
 
     def check_list_of_files(self, filelist):
         """Check Python code from a list of file names."""
 
-        for filepath in filelist:
-            for error in self.check_file(filepath):
-                yield filepath, error
+        # Yield every file path and CheckerError instance as they arrive.
+        for line in self.call_checker_list(list(filelist)):
+            match = self.BATCH_PATTERN.match(line)
+            if match:
+                kwargs = match.groupdict()
+                filepath = kwargs.pop("path")
+                yield filepath, self._new_error(**kwargs)
 
     def _new_error(self, **kwargs):
         """Return new instance of CheckError."""
 
         error = CheckerError(**kwargs)
-        error.type = self.NAME.lower()
+        error.type = intern(self.NAME.lower())
         self._set_error_case(error)
         return error
 
@@ -100,36 +418,270 @@ class Checker(object):
         error.case = error.code[0]
 
 
-class CheckerPep8(Checker):
-    """Python code checker based on Pep8 style guide."""
+@register
+class CheckerSyntax(Checker):
+    """Fast Python code checker based on the built-in compiler.
 
-    NAME = "Pep8"
+    The code is only parsed within the plugin process, so it takes a few
+    milliseconds. If pyflakes is installed, the syntax tree is also checked
+    with it (e.g. for undefined names and unused imports).
+    """
+
+    NAME = "Syntax"
+    COST = "fast"
+
+    # Case of the errors which make the slower checkers pointless.
+    FATAL_CASE = "F"
+
+    # Codes given to the most common pyflakes messages (as flake8 does).
+    FLAKES_CODES = {
+        "UnusedImport": "F401",
+        "ImportStarUsed": "F403",
+        "RedefinedWhileUnused": "F811",
+        "UndefinedName": "F821",
+        "UndefinedExport": "F822",
+        "UndefinedLocal": "F823",
+        "DuplicateArgument": "F831",
+        "UnusedVariable": "F841",
+    }
 
     def __init__(self):
+        """Run when creating a new instance of CheckerSyntax."""
+
+        super(CheckerSyntax, self).__init__()
+        self.args = []
+
+    @classmethod
+    def get_version(cls):
+        """Return the version string of the Python compiler and pyflakes."""
+
+        try:
+            import pyflakes
+            return "{} pyflakes {}".format(sys.version, pyflakes.__version__)
+        except ImportError:
+            return sys.version
+
+    def call_checker(self, filepath, content=None):
+        """Parse the Python code and return the output log lines."""
+
+        # The compiler takes care of the encoding declaration of files.
+        if content is None:
+            try:
+                with open(filepath, "rb") as fileobj:
+                    content = fileobj.read()
+            except OSError as err:
+                return ["E902:1:1:{}".format(err)]
+
+        try:
+            with Metrics().timer("{}.compile".format(self.NAME)):
+                tree = ast.parse(content, filepath)
+        except SyntaxError as err:
+            return ["E999:{}:{}:SyntaxError: {}".format(
+                err.lineno or 1, err.offset or 1, err.msg)]
+        except ValueError as err:
+            return ["E999:1:1:ValueError: {}".format(err)]
+
+        try:
+            from pyflakes.checker import Checker as Flakes
+        except ImportError:
+            return []
+        messages = sorted(Flakes(tree, filepath).messages,
+                          key=lambda x: (x.lineno, x.col))
+        return ["{}:{}:{}:{}".format(
+            self.FLAKES_CODES.get(type(msg).__name__, "F999"), msg.lineno,
+            msg.col + 1, msg.message % msg.message_args)
+            for msg in messages]
+
+    def has_fatal_errors(self, errors):
+        """Return True if the code could not be parsed."""
+
+        return any(error.case == self.FATAL_CASE for error in errors)
+
+    @staticmethod
+    def _set_error_case(error):
+        """Extract error case from error code."""
+
+        error.case = "F" if error.code[0] == "E" else "W"
+
+
+@register
+class CheckerPep8(Checker):
+    """Python code checker based on Pep8 style guide.
+
+    The code is checked within the plugin process when the pep8 (or
+    pycodestyle) module can be imported, and by the pep8 command if not.
+    """
+
+    NAME = "Pep8"
+    COMMAND = "pep8"
+    FORMAT = "%(code)s:%(row)d:%(col)d:%(text)s"
+    IGNORE = "W391"
+    COST = "fast"
+    INCREMENTAL = True
+
+    DEFAULTS = {
+        "enable": True,
+        "incremental": True,
+        "inprocess": True,
+    }
+    LABELS = {
+        "incremental": "Check the edited lines while typing",
+        "inprocess": "Check within the plugin process",
+    }
+
+    # In-process backend (module, style guide and report class), built on
+    # first use by get_backend.
+    BACKEND = None
+    BACKEND_LOCK = Lock()
+
+    def __init__(self, inprocess=True):
         """Run when creating a new instance of CheckerPep8."""
 
+        super(CheckerPep8, self).__init__()
+        self.inprocess = inprocess
         self.args = [
-            "--format=%(code)s:%(row)d:%(col)d:%(text)s",
-            "--ignore=W391",
+            "--format={}".format(self.FORMAT),
+            "--ignore={}".format(self.IGNORE),
         ]
 
-    def call_checker(self, filepath):
+    @classmethod
+    def from_conf(cls, conf):
+        """Return a new checker set up from its configuration section."""
+
+        return cls(conf.get(cls.NAME, "inprocess", True))
+
+    @classmethod
+    def get_backend(cls):
+        """Return (module, style guide, report class) for in-process checks.
+
+        The style guide is built once with the options of the command line
+        call and it is only read afterwards, so every thread shares it.
+        Return None if neither pep8 nor pycodestyle can be imported.
+        """
+
+        with cls.BACKEND_LOCK:
+            if cls.BACKEND is None:
+                try:
+                    import pep8 as module
+                except ImportError:
+                    try:
+                        import pycodestyle as module
+                    except ImportError:
+                        cls.BACKEND = ()
+                        return None
+
+                class Report(module.BaseReport):
+                    """Report which keeps the errors instead of printing."""
+
+                    def __init__(self, options):
+                        """Run when creating a new instance of Report."""
+
+                        super(Report, self).__init__(options)
+                        self.found = []
+
+                    def error(self, line_number, offset, text, check):
+                        """Keep an error if it is not ignored."""
+
+                        code = super(Report, self).error(
+                            line_number, offset, text, check)
+                        if code:
+                            self.found.append(
+                                (line_number, offset + 1, code, text[5:]))
+                        return code
+
+                guide = module.StyleGuide(ignore=cls.IGNORE.split(","))
+                cls.BACKEND = (module, guide, Report)
+            return cls.BACKEND or None
+
+    @classmethod
+    def get_version(cls):
+        """Return the version string of the in-process module or command."""
+
+        backend = cls.get_backend()
+        if backend is None:
+            return super(CheckerPep8, cls).get_version()
+        return "{} {}".format(backend[0].__name__, backend[0].__version__)
+
+    @classmethod
+    def can_check_lines(cls):
+        """Return True if the in-process module for check_lines is found."""
+
+        return cls.get_backend() is not None
+
+    def run_backend(self, filepath, lines=None):
+        """Check source lines in-process (or the file if lines is None).
+
+        Return a list of (line, column, code, message) tuples. A new
+        checker and report are used for every call, so this is safe to
+        call from several threads at once.
+        """
+
+        module, guide, report_class = self.get_backend()
+        report = report_class(guide.options)
+        module.Checker(filepath, lines, guide.options, report=report)\
+            .check_all()
+        return report.found
+
+    def check_file(self, filepath, content=None):
+        """Check Python code, in-process if the module is available."""
+
+        if not self.inprocess or self.get_backend() is None:
+            return super(CheckerPep8, self).check_file(filepath, content)
+        lines = content.splitlines(True) if content is not None else None
+        with Metrics().timer("{}.inprocess".format(self.NAME)):
+            found = self.run_backend(filepath, lines)
+        return [self._new_error(code=code, line=line, column=column,
+                                message=message)
+                for line, column, code, message in found]
+
+    def check_list_of_files(self, filelist):
+        """Check Python code from a list of file names."""
+
+        if not self.inprocess or self.get_backend() is None:
+            return super(CheckerPep8, self).check_list_of_files(filelist)
+        return [(filepath, error)
+                for filepath in filelist
+                for error in self.check_file(filepath)]
+
+    def call_checker(self, filepath, content=None):
         """Call Pep8 in another thread and catch the output."""
 
-        # Complete the list of arguments.
-        self.args.insert(0, "pep8")
-        self.args.insert(1, filepath)
+        # Complete the list of arguments ("-" makes pep8 read from stdin).
+        if content is None:
+            args = [self.COMMAND, filepath] + self.args
+        else:
+            args = [self.COMMAND, "-"] + self.args
 
         # Call pep8 routine, catch the results into a buffer and return.
-        out_result = StringIO()
-        call = Popen(self.args, stdout=PIPE, stderr=PIPE)
-        try:
-            out_result.write(call.communicate()[0].decode(encoding="UTF-8"))
-        except BrokenPipeError:
-            call.kill()
-        return out_result
-
-    def _call_checker_deprecated(self, filepath):
+        return self._stream(args, content)
+
+    def call_checker_list(self, filelist):
+        """Call Pep8 once for a list of files and catch the output."""
+
+        # Replace the report format with one that includes the file path.
+        custom_format = "--format=%(path)s:{}".format(self.FORMAT)
+        args = [self.COMMAND] + filelist + [custom_format] + self.args[1:]
+        return self._stream(args, files=len(filelist))
+
+    def check_lines(self, lines, offset=0, context=0):
+        """Check a list of source lines in-process and return the errors.
+
+        The first context lines only give pep8 the surrounding statement
+        and blank lines, so their errors are dropped. The line numbers of
+        the other errors are shifted to start after offset. ImportError is
+        raised if the pep8 module is not available.
+        """
+
+        if self.get_backend() is None:
+            raise ImportError("No module named pep8 or pycodestyle")
+        with Metrics().timer("{}.incremental".format(self.NAME)):
+            found = self.run_backend("stdin", lines)
+        return [self._new_error(code=code, line=line - context + offset,
+                                column=column, message=message)
+                for line, column, code, message in found
+                if line > context]
+
+    def _call_checker_deprecated(self, filepath, content=None):
         """Deprecated version of call_checker for CheckerPep8."""
 
         import sys
@@ -149,9 +701,11 @@ class CheckerPep8(Checker):
         old_stdout, sys.stdout = sys.stdout, StringIO()
 
         # Call the pep8 routine.
-        with open(filepath, "r") as fileobj:
-            content = fileobj.read().splitlines(True)
-        pep8.Checker(filepath, content, opts).check_all()
+        if content is None:
+            with open(filepath, "r") as fileobj:
+                content = fileobj.read()
+        lines = content.splitlines(True)
+        pep8.Checker(filepath, lines, opts).check_all()
 
         # Catch the results from sys.stderr and sys.stdout and restore
         # their original values.
@@ -159,6 +713,7 @@ class CheckerPep8(Checker):
         out_result, sys.stdout = sys.stdout, old_stdout
         del err_result
 
+        out_result.seek(0)
         return out_result
 
     @staticmethod
@@ -169,47 +724,251 @@ class CheckerPep8(Checker):
         error.case = code[0] if (code[:2] == "E9") or (code[0] == "W") else "C"
 
 
+@register
 class CheckerPyLint(Checker):
     """Python code checker based on PyLint library."""
 
     NAME = "PyLint"
-
-    def __init__(self):
-        """Run when creating a new instance of CheckerPyLint."""
-
+    COMMAND = "pylint"
+    CROSS_MODULE = True
+    TEMPLATE = "{msg_id}:{line}:{column}:{msg}"
+    OUTPUTS = ("text", "json")
+    MAX_INSTANCES = 2
+
+    DEFAULTS = {
+        "enable": True,
+        "server": True,
+        "output": "text",
+    }
+    LABELS = {
+        "server": "Keep PyLint worker processes alive",
+    }
+
+    def __init__(self, output="text"):
+        """Run when creating a new instance of CheckerPyLint.
+
+        With output "json", PyLint reports are decoded in bulk with a single
+        json.loads, which keeps multiline messages intact and fills the
+        symbol, end line, end column and confidence of every error.
+        """
+
+        super(CheckerPyLint, self).__init__()
+        if output not in self.OUTPUTS:
+            msg = "output must be one of {}".format(", ".join(self.OUTPUTS))
+            raise ValueError(msg)
+        self.output = output
+        if output == "json":
+            report = "--output-format=json"
+        else:
+            report = "--msg-template={}".format(self.TEMPLATE)
         self.args = [
-            "--msg-template='{msg_id}:{line}:{column}:{msg}'",
+            report,
             "--extension-pkg-whitelist=gi.repository,numpy,scipy",
             "--good-names=i,j,k,r,c,x,y,z,t,_",
             "--reports=n",
         ]
 
-    def call_checker(self, filepath):
+    @classmethod
+    def from_conf(cls, conf):
+        """Return a new checker set up from its configuration section."""
+
+        output = conf.get(cls.NAME, "output", "text")
+        if conf.get(cls.NAME, "server", True):
+            return CheckerPyLintServer(output)
+        return cls(output)
+
+    def call_checker(self, filepath, content=None):
         """Call PyLint in another thread and catch the output."""
 
-        # Complete the list of arguments.
-        self.args.insert(0, "pylint")
-        self.args.insert(1, filepath)
+        # Complete the list of arguments ("--from-stdin" makes pylint read
+        # the module content from stdin).
+        if content is None:
+            args = [self.COMMAND, filepath] + self.args
+        else:
+            args = [self.COMMAND, "--from-stdin", filepath] + self.args
 
         # Call pylint routine, catch the results into a buffer and return.
-        out_result = StringIO()
-        call = Popen(self.args, stdout=PIPE, stderr=PIPE)
-        try:
-            out_result.write(call.communicate()[0].decode(encoding="UTF-8"))
-        except BrokenPipeError:
-            call.kill()
-        return out_result
+        return self._stream(args, content)
+
+    def call_checker_list(self, filelist):
+        """Call PyLint once for a list of files and catch the output.
+
+        A single invocation lets PyLint share the module inference among
+        all the files.
+        """
+
+        # Replace the message template with one that includes the path
+        # (JSON reports already include it).
+        if self.output == "json":
+            args = [self.COMMAND] + filelist + self.args
+        else:
+            template = "--msg-template={{abspath}}:{}".format(self.TEMPLATE)
+            args = [self.COMMAND] + filelist + [template] + self.args[1:]
+        return self._stream(args, files=len(filelist))
+
+    def check_file(self, filepath, content=None):
+        """Check Python code, decoding the whole report in json mode."""
 
-    def _call_checker_deprecated(self, filepath):
+        if self.output != "json":
+            return super(CheckerPyLint, self).check_file(filepath, content)
+        report = self.call_checker(filepath, content)
+        return [error for _, error in self.parse_json(report)]
+
+    def check_list_of_files(self, filelist):
+        """Check Python code from a list of file names."""
+
+        if self.output != "json":
+            return super(CheckerPyLint, self).check_list_of_files(filelist)
+        return self.parse_json(self.call_checker_list(list(filelist)))
+
+    def parse_json(self, report):
+        """Decode a JSON report in bulk and return (filepath, error) pairs.
+
+        Identical messages for the same file are grouped together.
+        """
+
+        report = "".join(report)
+        start = time.time()
+        try:
+            messages = json.loads(report or "[]")
+        except ValueError:
+            return []
+
+        found = OrderedDict()
+        for msg in messages:
+            error = self._new_error(
+                code=msg.get("message-id", ""), line=msg.get("line", 1),
+                column=msg.get("column", 1), message=msg.get("message", ""))
+            error.set_extra(msg.get("endLine"), msg.get("endColumn"),
+                            msg.get("symbol"), msg.get("confidence"))
+            filepath = os.path.abspath(msg.get("path", ""))
+            found.setdefault(filepath, []).append(error)
+        out = [(filepath, error)
+               for filepath, errors in found.items()
+               for error in self.group_errors(errors)]
+        Metrics().observe("{}.parse".format(self.NAME), time.time() - start)
+        return out
+
+    def _call_checker_deprecated(self, filepath, content=None):
         """Deprecated version of call_checker for CheckerPyLint."""
 
+        import sys
+        from io import BytesIO
+        from io import TextIOWrapper
         from pylint.lint import Run
         from pylint.reporters.text import TextReporter
 
         out_result = StringIO()
 
-        self.args.insert(0, filepath)
-        Run(self.args, reporter=TextReporter(out_result), exit=False)
+        if content is None:
+            args = [filepath] + self.args
+        else:
+            args = ["--from-stdin", filepath] + self.args
+            old_stdin, sys.stdin = sys.stdin, TextIOWrapper(
+                BytesIO(content.encode(encoding="UTF-8")), encoding="UTF-8")
+        try:
+            Run(args, reporter=TextReporter(out_result), exit=False)
+        finally:
+            if content is not None:
+                sys.stdin = old_stdin
 
+        out_result.seek(0)
         return out_result
 
+
+class CheckerPyLintServer(CheckerPyLint):
+    """Python code checker based on PyLint worker processes kept alive."""
+
+    SERVER = None
+    SERVER_LOCK = Lock()
+
+    def __init__(self, output="text"):
+        """Run when creating a new instance of CheckerPyLintServer."""
+
+        super(CheckerPyLintServer, self).__init__(output)
+        self.server = None
+        self.server_lock = Lock()
+
+    def cancel(self):
+        """Stop the checker, aborting the request sent to a worker."""
+
+        super(CheckerPyLintServer, self).cancel()
+        self._abort_server()
+
+    def time_out(self, timeout):
+        """Stop a check which has taken too long, aborting its request."""
+
+        super(CheckerPyLintServer, self).time_out(timeout)
+        self._abort_server()
+
+    def _abort_server(self):
+        """Abort the request being served by a worker, if any."""
+
+        with self.server_lock:
+            if self.server:
+                self.server.abort()
+
+    def _set_current_server(self, server):
+        """Keep the worker which is serving the request (or abort it).
+
+        The pool calls this with None before the worker serves another
+        request, so a late cancel never aborts someone else's request.
+        """
+
+        with self.server_lock:
+            self.server = server
+            if server and (self.cancelled or self.timed_out):
+                server.abort()
+
+    @classmethod
+    def get_server(cls):
+        """Return the pool of PyLint worker processes, creating it once."""
+
+        with cls.SERVER_LOCK:
+            if cls.SERVER is None:
+                cls.SERVER = PyLintServerPool()
+            return cls.SERVER
+
+    @classmethod
+    def stop_server(cls):
+        """Close the PyLint worker processes (restarted on demand)."""
+
+        with cls.SERVER_LOCK:
+            server, cls.SERVER = cls.SERVER, None
+        if server is not None:
+            server.stop()
+
+    def call_checker(self, filepath, content=None):
+        """Send the file to a PyLint worker process and catch the output.
+
+        The request takes a Governor slot, like a standalone process.
+        """
+
+        governor = Governor()
+        if not governor.acquire(lambda: self.cancelled):
+            return StringIO()
+        watchdog = governor.watch(self)
+        try:
+            with Metrics().timer("{}.server".format(self.NAME)):
+                output = self.get_server().request(
+                    filepath, self.args, content, self._set_current_server)
+        except ServerTimeout as err:
+            # The worker hangs (and has been stopped), so a standalone
+            # process would most likely hang too.
+            self.time_out(err.timeout)
+            output = None
+        except ServerError:
+            output = None
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            governor.release()
+
+        if output is None:
+            if self.cancelled or self.timed_out:
+                return StringIO()
+            # Fall back to a standalone PyLint process.
+            Metrics().count("{}.server_fallback".format(self.NAME))
+            return super(CheckerPyLintServer, self).call_checker(
+                filepath, content)
+        return StringIO(output)
@@ -0,0 +1,154 @@
+"""main/notifier.py
+
+Store the plugin class which shows notifications in the statusbar.
+"""
+
+import time
+from collections import OrderedDict
+from collections import deque
+from threading import Lock
+from gi.repository import GLib
+
+
+class Notifier(object):
+    """Statusbar notifications driven by a main loop timer.
+
+    Any thread can post messages and report task progress. Messages are
+    queued and shown one after the other, while running tasks are shown
+    as a progress line (e.g. "Checking 3/12 files, PyLint 1.2 s"). The
+    statusbar is only touched by the timer, which runs in the main loop
+    and stops once there is nothing left to show.
+    """
+
+    # Time (in seconds) a message is shown.
+    MESSAGE_LIFE = 3
+
+    # Interval (in milliseconds) between statusbar refreshes.
+    REFRESH_INTERVAL = 250
+
+    def __init__(self, get_statusbar, context):
+        """Run when creating a new instance of Notifier."""
+
+        self.get_statusbar = get_statusbar
+        self.context = context
+        self.lock = Lock()
+        self.messages = deque()
+        self.tasks = OrderedDict()
+        self.total = 0
+        self.done = 0
+        self.detail = None
+        self.current = None
+        self.expires = 0
+        self.timer = None
+
+    def post(self, message, life=None):
+        """Queue a message to be shown for a number of seconds."""
+
+        life = life if life is not None else self.MESSAGE_LIFE
+        with self.lock:
+            self.messages.append((message, life))
+        self.wake_up()
+
+    def task_started(self, key, label):
+        """Count a running task (e.g. the check of a file)."""
+
+        with self.lock:
+            if key not in self.tasks:
+                self.total += 1
+            self.tasks[key] = label
+        self.wake_up()
+
+    def task_finished(self, key, message=None):
+        """Count a finished task and queue its message if any.
+
+        A task finished without a message has been cancelled, so it is
+        not counted as done.
+        """
+
+        with self.lock:
+            if self.tasks.pop(key, None) is None:
+                return
+            if message is None:
+                self.total -= 1
+            else:
+                self.done += 1
+                self.messages.append((message, self.MESSAGE_LIFE))
+            if not self.tasks:
+                self.total = self.done = 0
+                self.detail = None
+        self.wake_up()
+
+    def set_detail(self, detail):
+        """Set a detail shown next to the task progress."""
+
+        with self.lock:
+            self.detail = detail
+
+    def get_progress(self):
+        """Return the progress line or None if there are no tasks."""
+
+        with self.lock:
+            if not self.tasks:
+                return None
+            if self.total == 1:
+                text = "Checking {}".format(next(iter(self.tasks.values())))
+            else:
+                text = "Checking {}/{} files".format(self.done, self.total)
+            if self.detail:
+                text = "{}, {}".format(text, self.detail)
+            return text
+
+    def wake_up(self):
+        """Start the main loop timer if it is not running."""
+
+        with self.lock:
+            if self.timer is not None:
+                return
+            self.timer = GLib.timeout_add(self.REFRESH_INTERVAL, self._tick)
+
+    def stop(self):
+        """Stop the timer and clear the statusbar."""
+
+        with self.lock:
+            self.messages.clear()
+            self.tasks.clear()
+            self.total = self.done = 0
+            self.current = None
+            if self.timer is not None:
+                GLib.source_remove(self.timer)
+                self.timer = None
+        self._show(None)
+
+    def _tick(self):
+        """Refresh the statusbar (run by the main loop timer)."""
+
+        now = time.time()
+        # Keep the current message until it expires.
+        if self.current is not None and now < self.expires:
+            return True
+        with self.lock:
+            message = self.messages.popleft() if self.messages else None
+        if message is not None:
+            self.current, self.expires = message[0], now + message[1]
+            self._show(self.current)
+            return True
+        self.current = None
+        progress = self.get_progress()
+        self._show(progress)
+        with self.lock:
+            if not self.tasks and not self.messages:
+                self.timer = None
+                return False
+        return True
+
+    def _show(self, text):
+        """Replace the statusbar text (None clears it)."""
+
+        try:
+            statusbar = self.get_statusbar()
+            context_id = statusbar.get_context_id(self.context)
+            statusbar.remove_all(context_id)
+            if text:
+                statusbar.push(context_id, text)
+        except AttributeError:
+            pass
@@ -0,0 +1,197 @@
+"""main/server.py
+
+Store the classes which keep PyLint worker processes alive during the whole
+Gedit session, so that the interpreter start-up, the astroid import and the
+inference of the imported modules are paid only once.
+"""
+
+import json
+import os
+import selectors
+from queue import Queue
+from subprocess import DEVNULL
+from subprocess import PIPE
+from subprocess import Popen
+from threading import Lock
+
+from . governor import Governor
+
+
+class ServerError(Exception):
+    """Raised when a worker process cannot complete a check request."""
+
+    pass
+
+
+class ServerTimeout(ServerError):
+    """Raised when a worker process does not answer a request in time."""
+
+    def __init__(self, timeout):
+        """Run when creating a new instance of ServerTimeout."""
+
+        super(ServerTimeout, self).__init__(
+            "PyLint worker did not answer within {} s".format(timeout))
+        self.timeout = timeout
+
+
+class PyLintServer(object):
+    """Handler for one PyLint worker process."""
+
+    INTERPRETER = "python3"
+    WORKER = os.path.join(os.path.dirname(__file__), "_pylint_worker.py")
+
+    # Number of checks after which the worker process is restarted, so that
+    # the memory held by the astroid cache does not grow forever.
+    MAX_JOBS = 50
+
+    # Time (in seconds) to wait for the answer of the worker process before
+    # stopping it, in case it hangs and no Governor timeout is set.
+    READ_TIMEOUT = 120
+
+    def __init__(self, max_jobs=None, timeout=None):
+        """Run when creating a new instance of PyLintServer."""
+
+        self.max_jobs = max_jobs if max_jobs is not None else self.MAX_JOBS
+        self.timeout = timeout if timeout is not None else self.READ_TIMEOUT
+        self.process = None
+        self.jobs = 0
+        self.lock = Lock()
+        self.aborted = False
+
+    def start(self):
+        """Launch a new worker process."""
+
+        self.process = Popen([self.INTERPRETER, self.WORKER],
+                             stdin=PIPE, stdout=PIPE, stderr=DEVNULL,
+                             universal_newlines=True, bufsize=1)
+        # The worker serves many checks, so it gets no CPU time limit.
+        Governor().limit(self.process.pid, cpu=False)
+        self.jobs = 0
+
+    def stop(self):
+        """Close the worker process if it is running."""
+
+        if self.process:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=1)
+            except Exception:
+                self.process.kill()
+            self.process = None
+
+    def restart(self):
+        """Replace the worker process with a new one."""
+
+        self.stop()
+        self.start()
+
+    def abort(self):
+        """Kill the worker process to stop the request in progress."""
+
+        self.aborted = True
+        process = self.process
+        if process:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+    def read_line(self):
+        """Return the next output line of the worker process.
+
+        Raise ServerTimeout (stopping the worker) if no line arrives within
+        the read timeout. An aborted worker gives an empty line.
+        """
+
+        if self.timeout:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.process.stdout, selectors.EVENT_READ)
+                if not selector.select(self.timeout):
+                    self.abort()
+                    self.stop()
+                    raise ServerTimeout(self.timeout)
+        return self.process.stdout.readline()
+
+    def is_alive(self):
+        """Return True if the worker process is running."""
+
+        return self.process is not None and self.process.poll() is None
+
+    def request(self, filepath, args, content=None):
+        """Send a check request to the worker and return its output log."""
+
+        with self.lock:
+            if self.aborted:
+                msg = "PyLint worker request aborted"
+                raise ServerError(msg)
+            # Restart the worker if it crashed or has served too many jobs.
+            # A crash in the middle of a request is retried once, unless the
+            # request has been aborted.
+            for attempt in range(2):
+                if not self.is_alive() or self.jobs >= self.max_jobs:
+                    self.restart()
+                self.jobs += 1
+                try:
+                    self.process.stdin.write(json.dumps(
+                        {"filepath": filepath, "args": args,
+                         "content": content}) + "\n")
+                    self.process.stdin.flush()
+                    line = self.read_line()
+                except (BrokenPipeError, OSError):
+                    line = ""
+                if line:
+                    break
+                self.stop()
+                if self.aborted:
+                    msg = "PyLint worker request aborted"
+                    raise ServerError(msg)
+            else:
+                msg = "PyLint worker process crashed"
+                raise ServerError(msg)
+
+        response = json.loads(line)
+        try:
+            return response["output"]
+        except KeyError:
+            raise ServerError(response.get("error", "unknown error"))
+
+
+class PyLintServerPool(object):
+    """Pool of PyLint worker processes shared by all the checks."""
+
+    SIZE = 2
+
+    def __init__(self, size=None):
+        """Run when creating a new instance of PyLintServerPool."""
+
+        self.size = size if size is not None else self.SIZE
+        self.servers = [PyLintServer() for _ in range(self.size)]
+        self.idle = Queue()
+        for server in self.servers:
+            self.idle.put(server)
+
+    def request(self, filepath, args, content=None, on_start=None):
+        """Send a check request to the first idle worker.
+
+        If on_start is given, it is called with the PyLintServer instance
+        which serves the request, so that the caller can abort it, and
+        with None once the request is over, before the worker goes back
+        to the pool.
+        """
+
+        server = self.idle.get()
+        server.aborted = False
+        try:
+            if on_start:
+                on_start(server)
+            return server.request(filepath, args, content)
+        finally:
+            if on_start:
+                on_start(None)
+            self.idle.put(server)
+
+    def stop(self):
+        """Close all the worker processes."""
+
+        for server in self.servers:
+            server.stop()
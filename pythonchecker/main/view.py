@@ -1,9 +1,13 @@
 """main/view.py
 
-Store the error list treeview with scrollbars.
+Store the error list treeviews with scrollbars.
 """
 
+import os
+from collections import OrderedDict
+from collections import deque
 from collections import namedtuple
+from operator import attrgetter
 from gi import require_version
 from gi.repository import GdkPixbuf
 from gi.repository import GObject
@@ -13,6 +17,260 @@ from .. _decorators import threaded_with_glib
 require_version("Gtk", "3.0")
 
 
+class ErrorListModel(GObject.Object, Gtk.TreeModel):
+    """Error list model backed directly by a list of CheckerError instances.
+
+    Rows are never copied: every cell value (including the icon) is taken
+    from the error instances when the treeview asks for it. The rows are
+    the backing list itself (sorted by position), or a sorted list of
+    references to its errors once the model is sorted by a column, so
+    sorting never reads the rows through the TreeModel interface. Iterators
+    store the row index plus one, since a zero user_data means an invalid
+    iter.
+    """
+
+    __gtype_name__ = "PythonChecker_Main_ErrorListModel"
+
+    def __init__(self, errors, columns, icons):
+        """Run when creating a new instance of ErrorListModel."""
+
+        super(ErrorListModel, self).__init__()
+        self.source = errors
+        self.errors = errors
+        self.columns = columns
+        self.icons = icons
+        self.sort_key = None
+        self.reverse = False
+
+    def get_error(self, treeiter):
+        """Return the CheckerError instance pointed by an iter."""
+
+        return self.errors[treeiter.user_data - 1]
+
+    @staticmethod
+    def get_position(error):
+        """Return the sort key of the backing list (the error position)."""
+
+        return (error.line, error.column)
+
+    def set_sort(self, key=None, reverse=False):
+        """Sort the rows by a key function of the errors.
+
+        Without a key, the rows follow the backing list. No row signals are
+        emitted, so the model has to be attached to its treeview again.
+        Return False if the rows were already sorted that way.
+        """
+
+        reverse = reverse and key is not None
+        if key is self.sort_key and reverse == self.reverse:
+            return False
+        self.sort_key, self.reverse = key, reverse
+        self.errors = self._sorted(self.source)
+        return True
+
+    def _sorted(self, errors):
+        """Return a list of errors in the row order of the model."""
+
+        if self.sort_key is None:
+            return errors
+        return sorted(errors, key=self.sort_key, reverse=self.reverse)
+
+    @staticmethod
+    def _find_index(rows, error, key, reverse=False):
+        """Return where an error goes to keep a list sorted by a key."""
+
+        value = key(error)
+        lower, upper = 0, len(rows)
+        while lower < upper:
+            middle = (lower + upper) // 2
+            other = key(rows[middle])
+            if (other >= value) if reverse else (other <= value):
+                lower = middle + 1
+            else:
+                upper = middle
+        return lower
+
+    def delete_rows(self, predicate):
+        """Delete the errors matching a predicate, emitting row signals.
+
+        The errors are deleted from the backing list too.
+        """
+
+        if self.errors is not self.source:
+            self.source[:] = [x for x in self.source if not predicate(x)]
+        for index in reversed(range(len(self.errors))):
+            if predicate(self.errors[index]):
+                del self.errors[index]
+                self.row_deleted(Gtk.TreePath((index,)))
+
+    def insert_rows(self, errors):
+        """Insert errors keeping the rows sorted, emitting row signals.
+
+        The errors are inserted into the backing list too.
+        """
+
+        for error in errors:
+            if self.errors is not self.source:
+                self.source.insert(self._find_index(
+                    self.source, error, self.get_position), error)
+            index = self._find_index(
+                self.errors, error, self.sort_key or self.get_position,
+                self.reverse)
+            self.errors.insert(index, error)
+            path = Gtk.TreePath((index,))
+            self.row_inserted(path, self.get_iter(path))
+
+    def update_rows(self, errors):
+        """Turn the rows into a new error list, emitting row signals.
+
+        Rows are matched by checker, code, message and position (errors
+        kept by the controller follow the edited lines, so unchanged errors
+        still match after an edit). Only the inserted, deleted and changed
+        rows are signaled, and the model is backed by the new list at the
+        end (keeping the sort order of the rows).
+        """
+
+        def key(error):
+            """Return the comparison key of an error."""
+            return (error.type, error.code, error.message, error.line,
+                    error.column)
+
+        # The old list may still be the error list of another document.
+        self.errors = list(self.errors)
+        rows = self._sorted(errors)
+        # Match every new error with the first old one with the same key.
+        # Matched rows must keep their order, so old rows found before the
+        # last match are left out (they are deleted and inserted again).
+        found = {}
+        for index, error in enumerate(self.errors):
+            found.setdefault(key(error), deque()).append(index)
+        matches = [None] * len(rows)
+        kept = set()
+        last = -1
+        for j, error in enumerate(rows):
+            candidates = found.get(key(error))
+            while candidates and candidates[0] <= last:
+                candidates.popleft()
+            if candidates:
+                last = matches[j] = candidates.popleft()
+                kept.add(last)
+        # Go backwards so the indexes of the rows not yet deleted hold.
+        for index in reversed(range(len(self.errors))):
+            if index not in kept:
+                del self.errors[index]
+                self.row_deleted(Gtk.TreePath((index,)))
+        # The kept rows are now in the new order, so the others are
+        # inserted between them.
+        for j, error in enumerate(rows):
+            if matches[j] is None:
+                self.errors.insert(j, error)
+                path = Gtk.TreePath((j,))
+                self.row_inserted(path, self.get_iter(path))
+                continue
+            changed = self.errors[j].count != error.count
+            self.errors[j] = error
+            if changed:
+                self._row_changed(j)
+        self.source, self.errors = errors, rows
+
+    def _row_changed(self, index):
+        """Emit the row-changed signal for a row index."""
+
+        path = Gtk.TreePath((index,))
+        self.row_changed(path, self.get_iter(path))
+
+    def _new_iter(self, index):
+        """Return (True, iter) for a valid row index, (False, None) if not."""
+
+        if 0 <= index < len(self.errors):
+            treeiter = Gtk.TreeIter()
+            treeiter.user_data = index + 1
+            return (True, treeiter)
+        return (False, None)
+
+    def do_get_flags(self):
+        """Return the model flags."""
+
+        # Iterators store row indexes, so they do not survive row changes.
+        return Gtk.TreeModelFlags.LIST_ONLY
+
+    def do_get_n_columns(self):
+        """Return the number of columns."""
+
+        return len(self.columns)
+
+    def do_get_column_type(self, index):
+        """Return the type of a column."""
+
+        return self.columns[index].type
+
+    def do_get_iter(self, path):
+        """Return an iter pointing to a path."""
+
+        return self._new_iter(path.get_indices()[0])
+
+    def do_get_path(self, treeiter):
+        """Return the path pointed by an iter."""
+
+        return Gtk.TreePath((treeiter.user_data - 1,))
+
+    def do_get_value(self, treeiter, index):
+        """Return the value of a cell, building it on demand."""
+
+        error = self.get_error(treeiter)
+        name = self.columns[index].name
+        if name == "Case":
+            return self.icons.get(error.case, self.icons["E"])
+        if name == "Message" and error.count > 1:
+            return "{} (x{})".format(error.message, error.count)
+        return getattr(error, name.lower())
+
+    def do_iter_next(self, treeiter):
+        """Move an iter to the next row."""
+
+        if treeiter.user_data < len(self.errors):
+            treeiter.user_data += 1
+            return True
+        return False
+
+    def do_iter_previous(self, treeiter):
+        """Move an iter to the previous row."""
+
+        if treeiter.user_data > 1:
+            treeiter.user_data -= 1
+            return True
+        return False
+
+    def do_iter_children(self, parent):
+        """Return an iter to the first child (only for the root)."""
+
+        if parent is None:
+            return self._new_iter(0)
+        return (False, None)
+
+    def do_iter_has_child(self, treeiter):
+        """Return False since this is a flat list."""
+
+        return False
+
+    def do_iter_n_children(self, treeiter):
+        """Return the number of rows for the root or 0 for a row."""
+
+        return len(self.errors) if treeiter is None else 0
+
+    def do_iter_nth_child(self, parent, index):
+        """Return an iter to the nth row (only for the root)."""
+
+        if parent is None:
+            return self._new_iter(index)
+        return (False, None)
+
+    def do_iter_parent(self, child):
+        """Return (False, None) since rows have no parent."""
+
+        return (False, None)
+
+
 class TreeView(Gtk.TreeView):
     """Generic class for an error treeview."""
 
@@ -20,9 +278,6 @@ class TreeView(Gtk.TreeView):
 
     _Column =\
         namedtuple("Column", ["name", "title", "renderer", "type"])
-    _get_icon =\
-        lambda icon: Gtk.IconTheme.load_icon(
-            Gtk.IconTheme.get_default(), icon, 16, 0)
 
     COLUMNS = [
         _Column("Case", "",
@@ -39,12 +294,19 @@ class TreeView(Gtk.TreeView):
                 Gtk.CellRendererText, GObject.TYPE_STRING)
     ]
 
-    ERROR_ICONS = {
-        "E": _get_icon("emblem-important"),
-        "F": _get_icon("dialog-error"),
-        "W": _get_icon("dialog-warning"),
-        "C": _get_icon("dialog-information"),
-        "R": _get_icon("dialog-question"),
+    # Icon names for every error case (icons are loaded on first use).
+    ERROR_ICON_NAMES = {
+        "E": "emblem-important",
+        "F": "dialog-error",
+        "W": "dialog-warning",
+        "C": "dialog-information",
+        "R": "dialog-question",
+    }
+    ERROR_ICONS = None
+
+    # Sort keys for the columns whose values are not directly comparable.
+    SORT_KEYS = {
+        "Case": lambda error: error.case,
     }
 
     def __init__(self):
@@ -52,8 +314,16 @@ class TreeView(Gtk.TreeView):
 
         super(TreeView, self).__init__()
 
+        # Rows are sorted by the position of the errors until a column is
+        # clicked, and every attached model is sorted the same way.
+        self.sort_keys = [
+            self.SORT_KEYS.get(c.name, attrgetter(c.name.lower()))
+            for c in self.COLUMNS]
+        self.sort_column = None
+        self.sort_order = Gtk.SortType.ASCENDING
+
         # Set treeview model.
-        self.set_model(Gtk.ListStore(*[c.type for c in self.COLUMNS]))
+        self.set_model(self.new_model([]))
 
         # Set treeview header.
         self.set_headers_visible(True)
@@ -68,51 +338,154 @@ class TreeView(Gtk.TreeView):
             column.set_visible(c.name != "Type")
             column.set_resizable(True)
             column.set_reorderable(True)
+            column.set_clickable(True)
+            column.connect("clicked", self.on_column_clicked, i)
+            self.append_column(column)
+
+    @classmethod
+    def get_error_icons(cls):
+        """Return the error icons by case, loading them once."""
+
+        if cls.ERROR_ICONS is None:
+            theme = Gtk.IconTheme.get_default()
+            cls.ERROR_ICONS = dict(
+                (key, Gtk.IconTheme.load_icon(theme, val, 16, 0))
+                for key, val in cls.ERROR_ICON_NAMES.items())
+        return cls.ERROR_ICONS
+
+    def new_model(self, errors):
+        """Return a new model backed by a list of errors."""
+
+        return ErrorListModel(errors, self.COLUMNS, self.get_error_icons())
+
+    def on_column_clicked(self, column, index):
+        """Trigger when a column header is clicked, sorting the rows by it.
+
+        Clicking the sorting column again reverses the order.
+        """
+
+        if self.sort_column == index and \
+                self.sort_order == Gtk.SortType.ASCENDING:
+            self.sort_order = Gtk.SortType.DESCENDING
+        else:
+            self.sort_order = Gtk.SortType.ASCENDING
+        self.sort_column = index
+        for other in self.get_columns():
+            other.set_sort_indicator(other is column)
+        column.set_sort_order(self.sort_order)
+        self.swap_model(self.props.model)
+
+    def swap_model(self, model):
+        """Attach a model keeping the current sorting."""
+
+        key = None
+        if self.sort_column is not None:
+            key = self.sort_keys[self.sort_column]
+        changed = model.set_sort(
+            key, self.sort_order == Gtk.SortType.DESCENDING)
+        # Rows sorted again are not signaled, so the treeview has to read
+        # the attached model again.
+        if changed and self.props.model is model:
+            self.set_model(None)
+        self.set_model(model)
+
+
+class ProjectTreeView(Gtk.TreeView):
+    """Treeview for project-wide results, with one parent row per file."""
+
+    __gtype_name__ = "PythonChecker_Main_ProjectTreeView"
+
+    COLUMNS = [
+        TreeView._Column("Location", "File / Code",
+                         Gtk.CellRendererText, GObject.TYPE_STRING),
+        TreeView._Column("Line", "L",
+                         Gtk.CellRendererText, GObject.TYPE_INT),
+        TreeView._Column("Column", "C",
+                         Gtk.CellRendererText, GObject.TYPE_INT),
+        TreeView._Column("Message", "Message",
+                         Gtk.CellRendererText, GObject.TYPE_STRING),
+    ]
+
+    def __init__(self):
+        """Run when creating a new instance of ProjectTreeView."""
+
+        super(ProjectTreeView, self).__init__()
+
+        # Set treeview model.
+        self.set_model(Gtk.TreeStore(*[c.type for c in self.COLUMNS]))
+        self.root = None
+        self.files = {}
+
+        # Set treeview header.
+        self.set_headers_visible(True)
+        for i, c in enumerate(self.COLUMNS):
+            column = Gtk.TreeViewColumn(c.title)
+            cellrd = c.renderer()
+            if c.type == GObject.TYPE_INT:
+                cellrd.set_alignment(1, 0.5)
+            column.pack_start(cellrd, False)
+            column.add_attribute(cellrd, "text", i)
+            column.set_resizable(True)
             column.set_sort_column_id(i)
             self.append_column(column)
 
     @threaded_with_glib
-    def append(self, error, icon):
-        """Append an error row to the error list model."""
+    def clear(self, root=None):
+        """Clear the results and set the project root folder."""
 
-        try:
-            self.props.model.append(
-                (icon, error.type, error.code,
-                 error.line, error.column, error.message)
-            )
-        except AttributeError:
-            pass
+        self.root = root
+        self.files = {}
+        self.props.model.clear()
 
     @threaded_with_glib
-    def clear(self):
-        """Clear the error list model."""
+    def append(self, filepath, errors):
+        """Append the errors of a file under its parent row."""
 
+        if not errors:
+            return
+        model = self.props.model
         try:
-            self.props.model.clear()
-        except AttributeError:
-            pass
+            parent = self.files[filepath]
+        except KeyError:
+            location = os.path.relpath(filepath, self.root or "/")
+            parent = model.append(None, (location, 0, 0, ""))
+            self.files[filepath] = parent
+        for error in errors:
+            model.append(parent, (error.code, error.line, error.column,
+                                  error.message))
+        nrows = model.iter_n_children(parent)
+        model.set_value(parent, 3, "{} message{}".format(
+            nrows, "s" if nrows != 1 else ""))
 
 
-class View(Gtk.ScrolledWindow):
-    """Class for a plugin tab with scrollbars."""
+class PanelTab(Gtk.ScrolledWindow):
+    """Generic class for a plugin tab with scrollbars."""
 
-    __gtype_name__ = "PythonChecker_Main_View"
+    __gtype_name__ = "PythonChecker_Main_PanelTab"
 
     PANEL_NAME =\
         "Python Checker"
     PANEL_TITLE =\
         "Python Checker"
-    PANEL_ICON =\
-        Gtk.Image.new_from_stock(Gtk.STOCK_YES, Gtk.IconSize.MENU)
+    PANEL_ICON = None
 
-    def __init__(self):
-        """Run when creating a new instance of View."""
+    def __init__(self, treeview):
+        """Run when creating a new instance of PanelTab."""
 
-        super(View, self).__init__()
-        self.treeview = TreeView()
+        super(PanelTab, self).__init__()
+        self.treeview = treeview
         self.add(self.treeview)
         self.panel = None
 
+    @classmethod
+    def get_panel_icon(cls):
+        """Return the icon for the panel tab, creating it once."""
+
+        if cls.PANEL_ICON is None:
+            PanelTab.PANEL_ICON =\
+                Gtk.Image.new_from_stock(Gtk.STOCK_YES, Gtk.IconSize.MENU)
+        return cls.PANEL_ICON
+
     def add_to_panel(self, panel):
         """Add the plugin tab to the panel."""
 
@@ -129,7 +502,8 @@ class View(Gtk.ScrolledWindow):
             # Proceed if the panel is a Gedit.Panel (side panel prior to
             # Gedit version 3.12).
             self.panel.add_item(
-                self, self.PANEL_NAME, self.PANEL_TITLE, self.PANEL_ICON)
+                self, self.PANEL_NAME, self.PANEL_TITLE,
+                self.get_panel_icon())
             self.panel.activate_item(self)
             self.treeview.show_all()
 
@@ -147,18 +521,115 @@ class View(Gtk.ScrolledWindow):
                 self.panel.remove_item(self)
             self.panel = None
 
-    def append(self, error):
-        """Append an error row to the error list model."""
 
-        try:
-            icon = self.treeview.ERROR_ICONS[error.case]
-        except KeyError:
-            icon = self.treeview.ERROR_ICONS["E"]
+class View(PanelTab):
+    """Class for the plugin tab with the errors of the active document."""
+
+    __gtype_name__ = "PythonChecker_Main_View"
+
+    __gsignals__ = {
+        "check-project": (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    # Number of per-document models kept for fast tab switching.
+    MODEL_CACHE_SIZE = 32
+
+    def __init__(self):
+        """Run when creating a new instance of View."""
+
+        super(View, self).__init__(TreeView())
+        self.models = OrderedDict()
+
+        # Set the popup menu of the treeview.
+        self.menu = Gtk.Menu()
+        item = Gtk.MenuItem(label="Check whole project")
+        item.connect("activate", lambda *args: self.emit("check-project"))
+        self.menu.append(item)
+        self.menu.show_all()
+        self.treeview.connect("button-press-event", self.on_button_press)
+
+    def on_button_press(self, treeview, event):
+        """Trigger when a mouse button is pressed on the treeview."""
+
+        if event.button == 3:
+            self.menu.popup(None, None, None, None, event.button, event.time)
+            return True
+        return False
+
+    def set_errors(self, errors, key=None):
+        """Show a list of errors, reusing the model of the same key.
+
+        Models are kept by key (e.g. the document path), so switching to
+        a document whose error list has not changed only swaps the model.
+        A new error list for the same key (e.g. after a re-check) updates
+        the kept model in place, so the scroll position and the selection
+        are kept.
+        """
+
+        entry = self.models.pop(key, None)
+        if entry is None:
+            entry = (errors, self.treeview.new_model(errors))
+        elif entry[0] is not errors:
+            entry[1].update_rows(errors)
+            entry = (errors, entry[1])
+        if key is not None:
+            self.models[key] = entry
+            while len(self.models) > self.MODEL_CACHE_SIZE:
+                self.models.popitem(last=False)
+        self.treeview.swap_model(entry[1])
+
+    def forget(self, key):
+        """Drop the model kept for a key."""
+
+        self.models.pop(key, None)
+
+    def splice_errors(self, errors, key, predicate, new_errors):
+        """Replace the errors matching a predicate with new ones in place.
+
+        Only the affected rows are deleted and inserted, so the rest of
+        the list (and the treeview state) is kept.
+        """
+
+        entry = self.models.get(key)
+        if entry is not None and entry[0] is errors:
+            model = entry[1]
+        else:
+            model = ErrorListModel(errors, TreeView.COLUMNS, {})
+        model.delete_rows(predicate)
+        model.insert_rows(new_errors)
+
+    def refresh(self):
+        """Redraw the rows, e.g. after their line numbers are shifted."""
 
-        self.treeview.append(error, icon)
+        self.treeview.queue_draw()
 
     def clear(self):
         """Clear the error list model."""
 
-        self.treeview.clear()
+        self.set_errors([])
+
+
+class ProjectView(PanelTab):
+    """Class for the plugin tab with the results of a project check."""
+
+    __gtype_name__ = "PythonChecker_Main_ProjectView"
+
+    PANEL_NAME =\
+        "Python Checker (project)"
+    PANEL_TITLE =\
+        "Python Checker (project)"
+
+    def __init__(self):
+        """Run when creating a new instance of ProjectView."""
+
+        super(ProjectView, self).__init__(ProjectTreeView())
+
+    def clear(self, root=None):
+        """Clear the results and set the project root folder."""
+
+        self.treeview.clear(root)
+
+    def append(self, filepath, errors):
+        """Append the errors of a file."""
 
+        self.treeview.append(filepath, errors)
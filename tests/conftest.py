@@ -0,0 +1,16 @@
+"""tests/conftest.py
+
+Run the tests against the package of this tree with a temporary home
+folder, so the configuration, cache and index files of the user are never
+touched. Only the modules which do not need Gedit are tested.
+"""
+
+import os
+import sys
+import tempfile
+
+# The configuration paths are computed on import, so HOME is replaced
+# before any module of the package is imported.
+os.environ["HOME"] = tempfile.mkdtemp(prefix="pythonchecker-tests-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
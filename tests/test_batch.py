@@ -0,0 +1,89 @@
+"""tests/test_batch.py
+
+Test the project-wide batch check on a temporary folder, with the
+built-in syntax checker (which needs no external command).
+"""
+
+import os
+
+from pythonchecker.main.batch import BatchCheck
+from pythonchecker.main.batch import find_project_root
+from pythonchecker.main.index import ProjectIndex
+from pythonchecker.main.model import CHECKERS
+from pythonchecker.main.model import CheckerSyntax
+
+
+FILES = {
+    "setup.py": "name = \"pkg\"\n",
+    "pkg/__init__.py": "",
+    "pkg/good.py": "x = 1\n",
+    "pkg/bad.py": "def f(:\n",
+    ".venv/ignored.py": "def f(:\n",
+    "pkg/notes.txt": "def f(:\n",
+}
+
+
+def make_project(root):
+    """Write the project files within a folder."""
+
+    for name, content in FILES.items():
+        path = os.path.join(str(root), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fileobj:
+            fileobj.write(content)
+    return str(root)
+
+
+def get_codes(batch, root, index=None):
+    """Run a batch check and return the error codes by relative path."""
+
+    return dict((os.path.relpath(path, root), [x.code for x in errors])
+                for path, name, errors in batch.run(root, index))
+
+
+def test_batch_checks_the_python_files(tmp_path):
+    root = make_project(tmp_path)
+    batch = BatchCheck(["Syntax"], batch_size=2, jobs=2)
+    assert get_codes(batch, root) == {
+        "setup.py": [],
+        "pkg/__init__.py": [],
+        "pkg/good.py": [],
+        "pkg/bad.py": ["E999"],
+    }
+    assert (batch.files, batch.skipped, batch.failures) == (4, 0, {})
+    assert find_project_root(os.path.join(root, "pkg")) == root
+
+
+def test_index_skips_the_unchanged_files(tmp_path):
+    root = make_project(tmp_path / "project")
+    folder = str(tmp_path / "index")
+    get_codes(BatchCheck(["Syntax"]), root, ProjectIndex(root, folder))
+    with open(os.path.join(root, "pkg", "good.py"), "w") as fileobj:
+        fileobj.write("x = (\n")
+    batch = BatchCheck(["Syntax"])
+    codes = get_codes(batch, root, ProjectIndex(root, folder))
+    assert codes["pkg/good.py"] == ["E999"]
+    assert codes["pkg/bad.py"] == ["E999"]
+    assert batch.skipped == 3
+    batch.elapsed = 2.0
+    assert batch.get_throughput() == 0.5
+    assert batch.get_summary().startswith("Checked 1 of 4 files in 2.0 s")
+
+
+class CheckerBroken(CheckerSyntax):
+    """Syntax checker whose command cannot be run."""
+
+    NAME = "Broken"
+
+    def call_checker(self, filepath, content=None):
+        raise OSError("command not found")
+
+
+def test_unavailable_checkers_are_reported(tmp_path, monkeypatch):
+    monkeypatch.setitem(CHECKERS, CheckerBroken.NAME, CheckerBroken)
+    root = make_project(tmp_path)
+    batch = BatchCheck(["Broken", "Syntax"])
+    codes = get_codes(batch, root)
+    assert codes["pkg/bad.py"] == ["E999"]
+    assert batch.failures == {"Broken": "command not found"}
+    assert "checker Broken unavailable" in batch.get_summary()
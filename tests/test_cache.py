@@ -0,0 +1,75 @@
+"""tests/test_cache.py
+
+Test the two-tier result cache.
+"""
+
+import os
+
+from pythonchecker.main.cache import ResultCache
+from pythonchecker.main.model import CheckerPyLint
+from pythonchecker.main.model import CheckerSyntax
+
+
+ROWS = [("E1", 1, 2, "first"), ("E2", 3, 4, "second")]
+
+
+def test_make_key_depends_on_content_and_checker():
+    checker = CheckerSyntax()
+    key = ResultCache.make_key("x = 1\n", checker)
+    assert key == ResultCache.make_key(b"x = 1\n", checker)
+    assert key != ResultCache.make_key("x = 2\n", checker)
+    other = CheckerSyntax()
+    other.args = ["--option"]
+    assert key != ResultCache.make_key("x = 1\n", other)
+
+
+def test_cross_module_checkers_are_not_cached():
+    assert ResultCache.make_key("x = 1\n", CheckerPyLint()) is None
+
+
+def test_results_survive_in_the_disk_tier(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.get("key") is None
+    cache.put("key", [list(x) for x in ROWS])
+    assert cache.get("key") == ROWS
+    # A new instance only has the disk tier.
+    other = ResultCache(str(tmp_path))
+    assert other.get("key") == ROWS
+    stats = other.get_stats()
+    assert stats["disk_hits"] == 1 and stats["memory_entries"] == 1
+    assert other.get("key") == ROWS
+    assert other.get_stats()["memory_hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_size=2, disk_size=2)
+    for key in ["a", "b", "c"]:
+        cache.put(key, ROWS)
+    assert sorted(os.listdir(str(tmp_path))) == ["b.json", "c.json"]
+    # A disk hit makes an entry the most recently used one.
+    cache.memory.clear()
+    assert cache.get("b") == ROWS
+    cache.put("d", ROWS)
+    assert list(cache.memory) == ["b", "d"]
+    assert sorted(os.listdir(str(tmp_path))) == ["b.json", "d.json"]
+    assert cache.get("a") is None
+
+
+def test_disk_order_is_restored_from_the_modification_times(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for index, key in enumerate(["b", "a", "c"]):
+        cache.put(key, ROWS)
+        os.utime(os.path.join(str(tmp_path), key + ".json"),
+                 (index, index))
+    other = ResultCache(str(tmp_path), disk_size=2)
+    other.put("d", ROWS)
+    assert sorted(os.listdir(str(tmp_path))) == ["c.json", "d.json"]
+
+
+def test_unpersisted_results_stay_in_memory(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("key", ROWS, persist=False)
+    assert cache.get("key") == ROWS
+    assert not [x for x in os.listdir(str(tmp_path))
+                if x.endswith(".json")]
+    assert ResultCache(str(tmp_path)).get("key") is None
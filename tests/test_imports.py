@@ -0,0 +1,42 @@
+"""tests/test_imports.py
+
+Check the imports of the package in a fresh interpreter for every test:
+the configuration stays cheap to import and the command line check runs
+without Gedit.
+"""
+
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_imported(module):
+    """Return the names of the modules loaded by importing a module."""
+
+    code = "import sys, {}; print(' '.join(sorted(sys.modules)))".format(
+        module)
+    output = subprocess.check_output(
+        [sys.executable, "-c", code], cwd=ROOT, env=dict(
+            os.environ, PYTHONPATH=ROOT), universal_newlines=True)
+    return set(output.split())
+
+
+def test_configuration_does_not_import_the_checkers():
+    imported = get_imported("pythonchecker.conf.model")
+    assert "pythonchecker.main.model" not in imported
+    assert "pythonchecker.main.engine" not in imported
+
+
+def test_command_line_check_runs_without_gedit(tmp_path):
+    (tmp_path / "module.py").write_text("def f(:\n")
+    call = subprocess.run(
+        [sys.executable, "-m", "pythonchecker", "--checkers", "Syntax",
+         "--full", str(tmp_path)],
+        cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    assert call.returncode == 1
+    assert "E999" in call.stdout
@@ -0,0 +1,109 @@
+"""tests/test_incremental.py
+
+Test the incremental checking of the edited regions of a document.
+"""
+
+import os
+import sys
+
+import pytest
+
+from pythonchecker.main.incremental import EditTracker
+from pythonchecker.main.incremental import find_region
+from pythonchecker.main.model import CheckerError
+from pythonchecker.main.model import CheckerPep8
+
+
+LINES = [
+    "import os\n",
+    "\n",
+    "\n",
+    "def f():\n",
+    "    x = 1\n",
+    "    return x\n",
+    "\n",
+    "\n",
+    "y = 2\n",
+]
+
+
+def get_region(first, last, lines=LINES):
+    """Return find_region for a list of lines."""
+
+    return find_region(lambda i: lines[i], len(lines), first, last)
+
+
+def test_find_region_expands_to_top_level_statements():
+    start, stop, prefix = get_region(4, 4)
+    assert (start, stop) == (3, 8)
+    assert prefix == ["pass\n", "\n", "\n"]
+
+
+def test_find_region_keeps_decorators_and_continuations():
+    lines = ["@decorator\n", "def f():\n", "    pass\n",
+             "try:\n", "    pass\n", "except OSError:\n", "    pass\n"]
+    assert get_region(1, 1, lines)[:2] == (0, 3)
+    assert get_region(6, 6, lines)[:2] == (3, 7)
+
+
+def test_find_region_clamps_the_edited_lines():
+    assert get_region(-5, 100)[:2] == (0, 9)
+
+
+def test_edit_tracker_follows_insertions_and_deletions():
+    tracker = EditTracker()
+    assert not tracker.is_dirty()
+    tracker.insert(10, 0)
+    tracker.insert(2, 3)
+    assert (tracker.first, tracker.last) == (2, 13)
+    tracker.delete(0, 2)
+    assert (tracker.first, tracker.last) == (0, 11)
+    assert not tracker.clear(tracker.version - 1)
+    assert tracker.clear(tracker.version)
+    assert not tracker.is_dirty()
+
+
+def test_shift_errors_moves_the_following_lines():
+    errors = [CheckerError("E1", line, 1, "m") for line in (1, 5, 10)]
+    EditTracker.shift_errors(errors, 2, 2)
+    assert [x.line for x in errors] == [1, 7, 12]
+    # Errors within deleted lines go to the first line kept.
+    EditTracker.shift_errors(errors, 2, -5)
+    assert [x.line for x in errors] == [1, 3, 7]
+
+
+def test_region_checks_need_the_in_process_module(monkeypatch):
+    monkeypatch.setattr(CheckerPep8, "BACKEND", ())
+    assert not CheckerPep8.can_check_lines()
+    with pytest.raises(ImportError):
+        CheckerPep8().check_lines(["x = 1\n"])
+
+
+@pytest.fixture
+def pep8_command(tmp_path, monkeypatch):
+    """Install a pep8 command which runs the in-process backend module."""
+
+    backend = CheckerPep8.get_backend()
+    if backend is None:
+        pytest.skip("neither pep8 nor pycodestyle is installed")
+    command = tmp_path / CheckerPep8.COMMAND
+    command.write_text(
+        "#!{}\nimport sys\nimport {}\nsys.exit({}._main())\n".format(
+            sys.executable, backend[0].__name__, backend[0].__name__))
+    command.chmod(0o755)
+    monkeypatch.setenv("PATH", "{}{}{}".format(
+        tmp_path, os.pathsep, os.environ.get("PATH", "")))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(sys.path))
+
+
+def test_check_lines_matches_the_full_check(tmp_path, pep8_command):
+    # E226 is in the default ignore list of pep8, which the command line
+    # replaces with --ignore, so both checks must report it.
+    lines = ["import os\n", "x = 1+2\n", "y = x  # ok\n", "z=3\n"]
+    path = tmp_path / "module.py"
+    path.write_text("".join(lines))
+    full = list(CheckerPep8(inprocess=False).check_file(str(path)))
+    partial = CheckerPep8().check_lines(lines[1:], offset=1, context=0)
+    assert "E226" in [x.code for x in full]
+    assert sorted((x.code, x.line, x.column) for x in full) ==\
+        sorted((x.code, x.line, x.column) for x in partial)
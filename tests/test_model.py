@@ -0,0 +1,160 @@
+"""tests/test_model.py
+
+Test the error instances and the output parsing of the code checkers,
+with the checker commands replaced by canned output lines.
+"""
+
+import pytest
+
+from pythonchecker.main.model import CheckerError
+from pythonchecker.main.model import CheckerPep8
+from pythonchecker.main.model import CheckerPyLint
+from pythonchecker.main.model import CheckerSyntax
+from pythonchecker.main.model import get_default_pipeline
+
+
+def canned(checker, lines, consumed=None):
+    """Replace the checker commands with canned output lines.
+
+    The lines read by the checker are appended to consumed if given.
+    """
+
+    def call_checker(filepath, content=None):
+        for line in lines:
+            if consumed is not None:
+                consumed.append(line)
+            yield line
+
+    def call_checker_list(filelist):
+        return call_checker(None)
+
+    checker.call_checker = call_checker
+    checker.call_checker_list = call_checker_list
+    return checker
+
+
+def test_errors_use_slots_and_interned_strings():
+    first = CheckerError("e501", "12", "0", "line too long")
+    second = CheckerError("E501", 3, 4, "line too long")
+    assert not hasattr(first, "__dict__")
+    assert (first.code, first.line, first.column) == ("E501", 12, 1)
+    assert first.message == "Line too long"
+    assert first.message is second.message
+    assert CheckerError("", "x", "", "").line == 1
+
+
+def test_copies_are_independent():
+    error = CheckerError("E1", 1, 2, "message")
+    error.set_extra(end_line=3, symbol="symbol", count=2)
+    copy = error.copy()
+    copy.line += 5
+    assert error.line == 1 and copy.line == 6
+    assert (copy.end_line, copy.symbol, copy.count) == (3, "symbol", 2)
+
+
+def test_pep8_output_is_parsed():
+    checker = canned(CheckerPep8(inprocess=False), [
+        "E225:4:2:missing whitespace around operator\n",
+        "W291:5:10:trailing whitespace\n",
+        "not an error line\n",
+        "E902:1:1:OSError: no such file\n",
+    ])
+    errors = list(checker.check_file("module.py"))
+    assert [(x.code, x.line, x.column, x.case) for x in errors] == [
+        ("E225", 4, 2, "C"), ("W291", 5, 10, "W"), ("E902", 1, 1, "E")]
+    assert errors[2].message == "OSError: no such file"
+    assert {x.type for x in errors} == {"pep8"}
+
+
+def test_output_lines_are_parsed_as_they_arrive():
+    consumed = []
+    checker = canned(CheckerPep8(inprocess=False), [
+        "E225:1:2:first\n", "E225:2:2:second\n"], consumed)
+    errors = checker.check_file("module.py")
+    assert next(errors).message == "First"
+    assert consumed == ["E225:1:2:first\n"]
+
+
+def test_pylint_text_output_is_parsed():
+    checker = canned(CheckerPyLint(), [
+        "************* Module module\n",
+        "C0103:1:0:Constant name \"x\" doesn't conform: a:b\n",
+        "W0611:3:0:Unused import os\n",
+    ])
+    errors = list(checker.check_file("module.py"))
+    assert [(x.code, x.line, x.column, x.case) for x in errors] == [
+        ("C0103", 1, 1, "C"), ("W0611", 3, 1, "W")]
+    assert errors[0].message == "Constant name \"x\" doesn't conform: a:b"
+
+
+def test_batch_output_is_split_by_file():
+    checker = canned(CheckerPep8(inprocess=False), [
+        "/project/a.py:E225:4:2:missing whitespace\n",
+        "/project/b.py:W291:1:3:trailing whitespace\n",
+    ])
+    found = list(checker.check_list_of_files(["/project/a.py",
+                                              "/project/b.py"]))
+    assert [(path, x.code, x.line) for path, x in found] == [
+        ("/project/a.py", "E225", 4), ("/project/b.py", "W291", 1)]
+
+
+def test_errors_survive_a_dump_and_load():
+    checker = CheckerPep8()
+    error = CheckerError("E225", 4, 2, "message")
+    error.set_extra(end_line=5, confidence="HIGH", count=3)
+    loaded = checker.load_errors(checker.dump_errors([error]))[0]
+    assert checker.dump_errors([loaded]) == checker.dump_errors([error])
+    assert (loaded.type, loaded.case) == ("pep8", "C")
+
+
+def test_pylint_json_report_is_decoded_in_bulk():
+    report = """[
+        {"path": "/project/a.py", "line": 3, "column": 0, "endLine": 3,
+         "endColumn": 9, "message-id": "W0611", "symbol": "unused-import",
+         "message": "Unused import os", "confidence": "UNDEFINED"},
+        {"path": "/project/a.py", "line": 3, "column": 0,
+         "message-id": "W0611", "message": "Unused import os"},
+        {"path": "/project/b.py", "line": 1, "column": 4,
+         "message-id": "C0114", "message": "Missing docstring\\nline 2"}
+    ]"""
+    checker = canned(CheckerPyLint(output="json"),
+                     report.splitlines(True))
+    found = list(checker.check_list_of_files(["/project/a.py",
+                                              "/project/b.py"]))
+    assert [(path, x.code, x.count) for path, x in found] == [
+        ("/project/a.py", "W0611", 2), ("/project/b.py", "C0114", 1)]
+    first = found[0][1]
+    assert (first.end_line, first.end_column) == (3, 9)
+    assert (first.symbol, first.confidence) == ("unused-import", "UNDEFINED")
+    assert found[1][1].message == "Missing docstring\nline 2"
+    errors = checker.check_file("/project/a.py")
+    assert [x.code for x in errors] == ["W0611", "C0114"]
+
+
+def test_pylint_json_report_errors_are_ignored():
+    checker = canned(CheckerPyLint(output="json"), ["[{", "broken"])
+    assert checker.check_file("module.py") == []
+    assert canned(CheckerPyLint(output="json"), []).check_file("x") == []
+
+
+def test_pylint_output_must_be_known():
+    with pytest.raises(ValueError):
+        CheckerPyLint(output="xml")
+
+
+def test_syntax_errors_stop_the_pipeline():
+    checker = CheckerSyntax()
+    errors = list(checker.check_file("module.py", "def f(:\n    pass\n"))
+    assert [(x.code, x.line, x.case) for x in errors] == [("E999", 1, "F")]
+    assert checker.has_fatal_errors(errors)
+    assert not checker.has_fatal_errors(
+        list(CheckerSyntax().check_file("module.py", "x = 1\n")))
+
+
+def test_default_pipeline_has_a_stage_per_cost_class():
+    assert get_default_pipeline() == "Syntax,Pep8;PyLint"
+
+
+def test_syntax_check_reports_unreadable_files(tmp_path):
+    errors = list(CheckerSyntax().check_file(str(tmp_path / "missing.py")))
+    assert [x.code for x in errors] == ["E902"]
@@ -0,0 +1,93 @@
+"""tests/test_scheduler.py
+
+Test the debounced and coalescing job scheduler.
+"""
+
+import time
+from threading import Event
+
+from pythonchecker._scheduler import Scheduler
+
+
+def wait_for(predicate, timeout=2.0):
+    """Wait until a predicate is true, returning its last value."""
+
+    end = time.time() + timeout
+    while not predicate() and time.time() < end:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_pending_jobs_of_a_key_are_coalesced():
+    scheduler = Scheduler(delay=0.1)
+    done = []
+    for value in range(5):
+        scheduler.schedule("key", lambda job, x: done.append(x), value)
+    assert wait_for(lambda: done)
+    time.sleep(0.2)
+    assert done == [4]
+    scheduler.stop()
+
+
+def test_new_job_supersedes_the_running_one():
+    scheduler = Scheduler(delay=0)
+    started, release = Event(), Event()
+    results = []
+
+    def run(job, value):
+        started.set()
+        release.wait(2)
+        results.append((value, job.is_cancelled()))
+
+    first = scheduler.schedule("key", run, 1)
+    assert started.wait(2)
+    assert not first.is_cancelled()
+    scheduler.schedule("key", run, 2)
+    # The running job is stale as soon as the new one is scheduled.
+    assert first.is_cancelled()
+    release.set()
+    assert wait_for(lambda: len(results) == 2)
+    assert results == [(1, True), (2, False)]
+    scheduler.stop()
+
+
+def test_cancel_drops_pending_jobs_and_calls_callbacks():
+    scheduler = Scheduler(delay=0)
+    started, release = Event(), Event()
+    callbacks = []
+
+    def run(job):
+        job.add_cancel_callback(lambda: callbacks.append(job))
+        started.set()
+        release.wait(2)
+
+    running = scheduler.schedule("running", run)
+    assert started.wait(2)
+    pending = scheduler.schedule("pending", run, delay=10)
+    scheduler.cancel("running")
+    scheduler.cancel("pending")
+    assert callbacks == [running]
+    assert running.is_cancelled() and pending.is_cancelled()
+    assert not scheduler.pending
+    release.set()
+    scheduler.stop()
+
+
+def test_full_queue_refuses_new_keys_only():
+    scheduler = Scheduler(delay=10, queue_size=2)
+    assert scheduler.schedule("a", lambda job: None) is not None
+    assert scheduler.schedule("b", lambda job: None) is not None
+    assert scheduler.schedule("c", lambda job: None) is None
+    # A key which is already pending is coalesced, so it always fits.
+    assert scheduler.schedule("a", lambda job: None) is not None
+    assert sorted(scheduler.pending) == ["a", "b"]
+    scheduler.stop()
+
+
+def test_stopped_scheduler_refuses_jobs():
+    scheduler = Scheduler(delay=0)
+    scheduler.schedule("a", lambda job: None)
+    scheduler.stop()
+    assert scheduler.schedule("b", lambda job: None) is None
+    assert wait_for(lambda: not any(x.is_alive()
+                                    for x in scheduler.threads))
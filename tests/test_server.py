@@ -0,0 +1,136 @@
+"""tests/test_server.py
+
+Test the PyLint worker processes with a fake worker script, so PyLint does
+not need to be installed.
+"""
+
+import os
+import sys
+import textwrap
+import types
+
+import pytest
+
+from pythonchecker.main import _pylint_worker
+from pythonchecker.main.server import PyLintServer
+from pythonchecker.main.server import PyLintServerPool
+from pythonchecker.main.server import ServerError
+from pythonchecker.main.server import ServerTimeout
+
+
+WORKER = """
+import json
+import os
+import sys
+import time
+
+for line in sys.stdin:
+    request = json.loads(line)
+    name = request["filepath"]
+    if name == "crash" and not os.path.exists(request["content"]):
+        open(request["content"], "w").close()
+        sys.exit(1)
+    if name == "hang":
+        time.sleep(30)
+    if name == "error":
+        print(json.dumps({"error": "bad request"}), flush=True)
+        continue
+    print(json.dumps({"output": "{} {}".format(name, os.getpid())}),
+          flush=True)
+"""
+
+
+@pytest.fixture
+def new_server(tmp_path):
+    """Return a function which creates servers running the fake worker."""
+
+    worker = tmp_path / "worker.py"
+    worker.write_text(textwrap.dedent(WORKER))
+    servers = []
+
+    def new_server(**kwargs):
+        server = PyLintServer(**kwargs)
+        server.INTERPRETER = sys.executable
+        server.WORKER = str(worker)
+        servers.append(server)
+        return server
+
+    yield new_server
+    for server in servers:
+        server.stop()
+
+
+def test_request_reuses_the_worker(new_server):
+    server = new_server(max_jobs=2)
+    first = server.request("a", [])
+    assert first.startswith("a ")
+    assert server.request("b", []).split()[1] == first.split()[1]
+    # The worker is restarted once it has served max_jobs requests.
+    assert server.request("c", []).split()[1] != first.split()[1]
+
+
+def test_request_is_retried_once_after_a_crash(new_server, tmp_path):
+    server = new_server()
+    marker = str(tmp_path / "crashed")
+    assert server.request("crash", [], marker).startswith("crash ")
+
+
+def test_request_reports_worker_errors(new_server):
+    with pytest.raises(ServerError, match="bad request"):
+        new_server().request("error", [])
+
+
+def test_request_times_out_and_stops_the_worker(new_server):
+    server = new_server(timeout=0.5)
+    with pytest.raises(ServerTimeout):
+        server.request("hang", [])
+    assert server.process is None
+
+
+def test_aborted_request_is_not_sent(new_server):
+    server = new_server()
+    server.abort()
+    with pytest.raises(ServerError):
+        server.request("a", [])
+
+
+def test_pool_hands_the_worker_back(new_server):
+    pool = PyLintServerPool(size=0)
+    pool.servers = [new_server()]
+    pool.idle.put(pool.servers[0])
+    calls = []
+    assert pool.request("a", [], on_start=calls.append).startswith("a ")
+    assert calls == [pool.servers[0], None]
+    assert pool.idle.qsize() == 1
+
+
+def test_worker_forgets_the_changed_modules(tmp_path, monkeypatch):
+    # A fake astroid manager whose cache holds a module per file.
+    manager = types.SimpleNamespace(astroid_cache={})
+    monkeypatch.setitem(sys.modules, "astroid",
+                        types.SimpleNamespace(MANAGER=manager))
+    monkeypatch.setattr(_pylint_worker, "STAMPS", {})
+    paths = dict((name, tmp_path / "{}.py".format(name))
+                 for name in ("main", "utils", "other"))
+    for path in paths.values():
+        path.write_text("x = 1\n")
+    manager.astroid_cache.update(
+        (name, types.SimpleNamespace(file=str(path)))
+        for name, path in paths.items())
+    manager.astroid_cache["builtins"] = types.SimpleNamespace(file=None)
+    _pylint_worker.remember_modules()
+
+    # Saving a module makes it stale, even if its mtime does not change.
+    stat = os.stat(str(paths["utils"]))
+    paths["utils"].write_text("x = 1\ny = 2\n")
+    os.utime(str(paths["utils"]), (stat.st_atime, stat.st_mtime))
+    paths["other"].unlink()
+    _pylint_worker.forget_modules(str(paths["main"]))
+    assert sorted(manager.astroid_cache) == ["builtins"]
+
+    # Unchanged modules are kept.
+    manager.astroid_cache["utils"] = types.SimpleNamespace(
+        file=str(paths["utils"]))
+    _pylint_worker.remember_modules()
+    _pylint_worker.forget_modules(str(paths["main"]))
+    assert sorted(manager.astroid_cache) == ["builtins", "utils"]
@@ -0,0 +1,28 @@
+"""tests/test_style.py
+
+Check the code of the package, its tests and its benchmarks with pep8
+(with its default ignore list, plus the codes which the plugin itself
+ignores).
+"""
+
+import os
+
+import pytest
+
+from pythonchecker.main.model import CheckerPep8
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_package_follows_pep8():
+    backend = CheckerPep8.get_backend()
+    if backend is None:
+        pytest.skip("neither pep8 nor pycodestyle is installed")
+    module = backend[0]
+    ignore = module.DEFAULT_IGNORE.split(",") + CheckerPep8.IGNORE.split(",")
+    guide = module.StyleGuide(ignore=ignore)
+    report = guide.check_files([os.path.join(ROOT, "pythonchecker"),
+                                os.path.join(ROOT, "tests"),
+                                os.path.join(ROOT, "benchmarks")])
+    assert report.total_errors == 0